@@ -3,6 +3,7 @@ Analytics module - Sentiment Analysis, Word Clouds, Statistics
 """
 import re
 from collections import Counter
+from datetime import datetime
 from pathlib import Path
 import sys
 
@@ -84,6 +85,16 @@ def analyze_posts_sentiment(posts):
     
     return results, sentiment_counts
 
+def count_sentiment(texts):
+    """Count sentiment labels over an iterable of texts (no per-post dicts)."""
+    sentiment_counts = {'positive': 0, 'negative': 0, 'neutral': 0}
+    
+    for text in texts:
+        _, label = analyze_sentiment(text)
+        sentiment_counts[label] += 1
+    
+    return sentiment_counts
+
 def analyze_comments_sentiment(comments):
     """Analyze sentiment for comments."""
     results = []
@@ -188,17 +199,21 @@ def calculate_engagement_metrics(posts):
 
 def find_best_posting_times(posts):
     """Analyze best times to post based on engagement."""
+    return best_posting_times(
+        (post.get('created_utc', ''), post.get('score', 0)) for post in posts
+    )
+
+def best_posting_times(created_scores):
+    """Best posting hours/days from (created_utc, score) pairs, e.g. zipped columns."""
     hourly_stats = {}
     daily_stats = {}
     
-    for post in posts:
-        created = post.get('created_utc', '')
+    for created, score in created_scores:
         if not created:
             continue
         
         try:
             # Parse ISO format
-            from datetime import datetime
             dt = datetime.fromisoformat(created.replace('Z', '+00:00'))
             hour = dt.hour
             day = dt.strftime('%A')
@@ -207,13 +222,13 @@ def find_best_posting_times(posts):
             if hour not in hourly_stats:
                 hourly_stats[hour] = {'count': 0, 'total_score': 0}
             hourly_stats[hour]['count'] += 1
-            hourly_stats[hour]['total_score'] += post.get('score', 0)
+            hourly_stats[hour]['total_score'] += score
             
             # Daily
             if day not in daily_stats:
                 daily_stats[day] = {'count': 0, 'total_score': 0}
             daily_stats[day]['count'] += 1
-            daily_stats[day]['total_score'] += post.get('score', 0)
+            daily_stats[day]['total_score'] += score
         except:
             continue
     
@@ -0,0 +1,68 @@
+"""
+Response Cache - Short-lived in-process cache for slow-changing API responses
+"""
+import asyncio
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+DEFAULT_TTL = 30
+MAX_ENTRIES = 256
+
+# key -> (expires_at, value)
+_cache = {}
+_locks = {}
+
+
+def _get(key):
+    """Return a fresh cached value, or None on miss/expiry."""
+    entry = _cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _set(key, value, ttl):
+    """Store a value, evicting the oldest entry when full."""
+    if len(_cache) >= MAX_ENTRIES and key not in _cache:
+        oldest = min(_cache, key=lambda k: _cache[k][0])
+        del _cache[oldest]
+    _cache[key] = (time.monotonic() + ttl, value)
+
+
+async def cached(key, ttl, fn, *args, **kwargs):
+    """
+    Return fn(*args, **kwargs) from cache, computing it in the threadpool on miss.
+
+    Concurrent misses for the same key share a lock so only one request
+    hits the database while the others wait for the fresh value.
+    """
+    value = _get(key)
+    if value is not None:
+        return value
+
+    lock = _locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            value = _get(key)
+            if value is None:
+                value = await run_in_threadpool(fn, *args, **kwargs)
+                _set(key, value, ttl)
+    finally:
+        # Waiters already hold the lock object; drop it so versioned keys don't pile up
+        if _locks.get(key) is lock:
+            del _locks[key]
+    return value
+
+
+def invalidate(prefix=None):
+    """Drop cached entries (all, or only keys starting with prefix)."""
+    if prefix is None:
+        count = len(_cache)
+        _cache.clear()
+        return count
+
+    keys = [k for k in _cache if k.startswith(prefix)]
+    for k in keys:
+        del _cache[k]
+    return len(keys)
@@ -0,0 +1,18 @@
+"""
+Gunicorn config - Production server for the REST API
+Run with: gunicorn api.server:app -c api/gunicorn_conf.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import API_HOST, API_PORT, API_WORKERS
+
+bind = f"{API_HOST}:{API_PORT}"
+workers = API_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Load the app once in the master so workers share code pages (copy-on-write).
+# The connection pool is opened per worker in the app lifespan, after fork.
+preload_app = True
+keepalive = 5
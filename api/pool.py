@@ -0,0 +1,101 @@
+"""
+Connection Pool - Reusable SQLite connections for the REST API
+Connections are opened once (read-only), tuned with PRAGMAs, and handed out per request.
+Writers (the scraper, init_database) keep using their own read-write connections.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config import DB_PATH, API_POOL_SIZE
+from export.database import get_connection
+
+# Applied once per connection when the pool is created. Every API endpoint
+# only reads, so connections are opened read-only with query_only as a guard.
+PRAGMAS = (
+    "PRAGMA query_only=1",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _prepare_database():
+    """Create/migrate the schema and switch to WAL (needs a read-write handle)."""
+    get_connection().close()
+
+
+def _connect():
+    """Open a read-only pooled connection with the tuned PRAGMAs applied."""
+    uri = f"{DB_PATH.resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def init_pool(size=API_POOL_SIZE):
+    """Create the process-wide pool (no-op if it already exists) and return it."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+
+        _prepare_database()
+        pool = queue.Queue(maxsize=size)
+        for _ in range(size):
+            pool.put(_connect())
+        _pool = pool
+        return pool
+
+
+def close_pool():
+    """
+    Close every idle connection and drop the pool.
+
+    Connections still checked out are closed by checkout() when they are
+    returned, since their pool is gone by then.
+    """
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is None:
+        return
+
+    while True:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+@contextmanager
+def checkout():
+    """
+    Borrow a connection from the pool.
+
+    Usage:
+        with checkout() as conn:
+            conn.execute("SELECT ...")
+    """
+    pool = _pool or init_pool()
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        with _pool_lock:
+            returned = pool is _pool
+            if returned:
+                pool.put(conn)
+        if not returned:
+            conn.close()
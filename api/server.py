@@ -5,9 +5,23 @@ For integration with Metabase, Grafana, DreamFactory, and other tools.
 Start with: python api/server.py
 Or: uvicorn api.server:app --reload --port 8000
 """
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers, MutableHeaders
 from typing import Optional, List
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from collections import defaultdict
+from itertools import chain
+import orjson
+import sqlparse
+from sqlparse.tokens import Keyword
+import hashlib
+import re
 import sys
 from pathlib import Path
 
@@ -15,10 +29,44 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from export.database import (
-    get_connection, search_posts, search_comments,
+    build_posts_search, select_columns, build_comments_search,
     get_subreddit_stats, get_all_subreddits,
-    get_job_history, get_job_stats, get_database_info
+    get_job_history, get_job_stats, get_database_info, data_version
 )
+from api.pool import init_pool, close_pool, checkout
+from api.cache import cached, invalidate
+from config import API_CORS_ORIGINS
+
+# Seconds to serve slow-changing aggregates from memory
+CACHE_TTL = 30
+
+# Rows encoded per streamed chunk
+STREAM_BATCH_SIZE = 200
+
+# Seconds to reuse database info for readiness probes
+READY_TTL = 10
+
+# Seconds to reuse a /grafana/query response while the data is unchanged
+GRAFANA_TTL = 300
+
+# Seconds to memoize the unfiltered "latest" pages (homepage/health dashboards)
+DEFAULT_PAGE_TTL = 15
+
+# Subreddit names for Grafana's variable dropdown, keyed by data_version()
+_subreddit_snapshot = {"version": None, "names": []}
+
+# Dashboard-polled endpoints that answer conditional GETs
+ETAG_PATHS = re.compile(r"^/(subreddits|jobs|jobs/stats|subreddits/[^/]+/stats)$")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Open the connection pool on startup and close it on shutdown."""
+    init_pool()
+    await run_in_threadpool(refresh_subreddit_snapshot)
+    yield
+    close_pool()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -26,23 +74,146 @@ app = FastAPI(
     description="REST API for Reddit Scraper data. Use with Metabase, Grafana, or any tool.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Enable CORS for external tools
+class ConditionalGetMiddleware:
+    """
+    Answer 304 Not Modified when the data behind a polled endpoint is unchanged.
+    
+    Plain ASGI rather than @app.middleware("http"): every other request,
+    including the streamed /posts and /query pages, passes straight through
+    without BaseHTTPMiddleware's per-request task and queue.
+    """
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "GET"
+                or not ETAG_PATHS.match(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+        
+        key = f"{scope['path']}?{scope['query_string'].decode('latin-1')}:{data_version()}"
+        etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+        
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            await Response(status_code=304, headers={"ETag": etag})(scope, receive, send)
+            return
+        
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                MutableHeaders(scope=message)["ETag"] = etag
+            await send(message)
+        
+        await self.app(scope, receive, send_with_etag)
+
+
+app.add_middleware(ConditionalGetMiddleware)
+
+
+# Compress JSON responses (large /posts and /query pages shrink 5-10x)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Enable CORS for external tools (Grafana/Metabase on :3000, dashboard on :8501)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for local tools
-    allow_credentials=True,
-    allow_methods=["*"],
+    allow_origins=API_CORS_ORIGINS,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    max_age=86400,  # Let browsers cache preflights for a day
 )
 
 
+def _json_rows(sql, params=(), envelope=None, table=False):
+    """
+    Yield a query's rows as JSON chunks while holding a pooled connection.
+    
+    Emits a bare array of records, or when envelope is given, the envelope's
+    keys plus "results" and a trailing "count". With table=True rows are
+    emitted as arrays under "columns"/"rows", skipping per-row dict building.
+    """
+    with checkout() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples; names come from description
+        cursor.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        
+        if table:
+            yield orjson.dumps(dict(envelope or {}, columns=columns))[:-1] + b',"rows":['
+            encode = orjson.dumps
+        else:
+            if envelope is None:
+                yield b"["
+            else:
+                yield orjson.dumps(envelope)[:-1] + b',"results":['
+            encode = lambda row: orjson.dumps(dict(zip(columns, row)))
+        
+        count = 0
+        while True:
+            rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+            if not rows:
+                break
+            chunk = b",".join(encode(row) for row in rows)
+            yield (b"," + chunk) if count else chunk
+            count += len(rows)
+        
+        if table or envelope is not None:
+            yield b'],"count":%d}' % count
+        else:
+            yield b"]"
+
+
+async def stream_query(sql, params=(), envelope=None, table=False):
+    """Run a query and stream its rows; SQL errors raise before streaming starts."""
+    rows = _json_rows(sql, params, envelope, table)
+    first = await run_in_threadpool(next, rows)
+    return StreamingResponse(
+        chain([first], rows),
+        media_type="application/json",
+        background=BackgroundTask(rows.close)
+    )
+
+
+def _fetch_table(sql, params=()):
+    """Run a query on a pooled connection and return (columns, rows)."""
+    with checkout() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        return [d[0] for d in cursor.description], cursor.fetchall()
+
+
+async def default_page(key, sql, limit, table=False):
+    """Serve an unfiltered listing from a short-lived memo of its rows."""
+    columns, rows = await cached(f"{key}:{limit}", DEFAULT_PAGE_TTL, _fetch_table, sql, (limit,))
+    if table:
+        content = {"columns": columns, "rows": rows, "count": len(rows)}
+    else:
+        content = [dict(zip(columns, row)) for row in rows]
+    return ORJSONResponse(content)
+
+
+def parse_fields(fields, table='posts'):
+    """Split and validate a ?fields= list; raises 400 on unknown columns."""
+    if not fields:
+        return None
+    columns = [f.strip() for f in fields.split(",") if f.strip()]
+    try:
+        select_columns(columns, table)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return columns
+
+
 # --- HEALTH & INFO ---
 
 @app.get("/", tags=["Info"])
-def root():
+async def root():
     """API root - basic info."""
     return {
         "name": "Reddit Scraper API",
@@ -53,93 +224,140 @@ def root():
 
 
 @app.get("/health", tags=["Info"])
-def health_check():
-    """Health check endpoint."""
+async def health_check():
+    """Liveness check - never touches the database."""
+    return {"status": "healthy"}
+
+
+@app.get("/health/ready", tags=["Info"])
+async def readiness_check():
+    """Readiness check - database info, cached briefly."""
     try:
-        info = get_database_info()
+        info = await cached("health:ready", READY_TTL, get_database_info)
         return {"status": "healthy", "database": info}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
 
 
 @app.get("/info", tags=["Info"])
-def database_info():
+async def database_info():
     """Get database info and table counts."""
-    return get_database_info()
+    return await cached("info", CACHE_TTL, get_database_info)
 
 
 # --- POSTS ---
 
 @app.get("/posts", tags=["Posts"])
-def list_posts(
+async def list_posts(
     q: Optional[str] = Query(None, description="Search query"),
     subreddit: Optional[str] = Query(None, description="Filter by subreddit"),
     author: Optional[str] = Query(None, description="Filter by author"),
     min_score: Optional[int] = Query(None, description="Minimum score"),
     post_type: Optional[str] = Query(None, description="Post type filter"),
-    limit: int = Query(100, ge=1, le=1000, description="Max results")
+    limit: int = Query(100, ge=1, le=1000, description="Max results"),
+    format: str = Query("records", pattern="^(records|table)$", description="records or columns/rows table"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,title,score")
 ):
     """
     Get posts with optional filters.
     
     Use for Grafana dashboards, Metabase queries, or custom integrations.
+    Pass ?fields= to skip large columns such as selftext.
     """
-    return search_posts(
+    columns = parse_fields(fields)
+    
+    # No filters: bounded scan of the created_utc index, memoized briefly
+    if q is None and subreddit is None and author is None and min_score is None and post_type is None:
+        return await default_page(
+            f"posts:latest:{fields}",
+            f"SELECT {select_columns(columns)} FROM posts ORDER BY created_utc DESC LIMIT ?",
+            limit, table=(format == "table")
+        )
+    
+    sql, params = build_posts_search(
         query=q,
         subreddit=subreddit,
         author=author,
         min_score=min_score,
         post_type=post_type,
-        limit=limit
+        limit=limit,
+        fields=columns
     )
+    return await stream_query(sql, params, table=(format == "table"))
 
 
 @app.get("/posts/{post_id}", tags=["Posts"])
-def get_post(post_id: str):
+async def get_post(
+    post_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,title,score")
+):
     """Get a single post by ID."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM posts WHERE id = ?", (post_id,))
-    row = cursor.fetchone()
-    conn.close()
+    sql = f"SELECT {select_columns(parse_fields(fields))} FROM posts WHERE id = ?"
+    
+    def fetch():
+        with checkout() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(sql, (post_id,))
+            row = cursor.fetchone()
+            return row and dict(zip([d[0] for d in cursor.description], row))
     
-    if not row:
+    post = await run_in_threadpool(fetch)
+    if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return dict(row)
+    return post
 
 
 # --- COMMENTS ---
 
 @app.get("/comments", tags=["Comments"])
-def list_comments(
+async def list_comments(
     q: Optional[str] = Query(None, description="Search in comment body"),
     post_id: Optional[str] = Query(None, description="Filter by post ID"),
     author: Optional[str] = Query(None, description="Filter by author"),
     min_score: Optional[int] = Query(None, description="Minimum score"),
-    limit: int = Query(100, ge=1, le=1000, description="Max results")
+    limit: int = Query(100, ge=1, le=1000, description="Max results"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. author,score,depth,body")
 ):
-    """Get comments with optional filters."""
-    return search_comments(
+    """
+    Get comments with optional filters.
+    
+    With post_id and ?fields= limited to post_id/score/depth/author/body the
+    thread is read straight from the covering index.
+    """
+    columns = parse_fields(fields, 'comments')
+    
+    if q is None and post_id is None and author is None and min_score is None:
+        return await default_page(
+            f"comments:top:{fields}",
+            f"SELECT {select_columns(columns, 'comments')} FROM comments ORDER BY score DESC LIMIT ?",
+            limit
+        )
+    
+    sql, params = build_comments_search(
         query=q,
         post_id=post_id,
         author=author,
         min_score=min_score,
-        limit=limit
+        limit=limit,
+        fields=columns
     )
+    return await stream_query(sql, params)
 
 
 # --- SUBREDDITS ---
 
 @app.get("/subreddits", tags=["Subreddits"])
-def list_subreddits():
+async def list_subreddits():
     """Get all scraped subreddits with post counts."""
-    return get_all_subreddits()
+    # Keyed on the data version so the body always matches the ETag
+    return await cached(f"subreddits:{data_version()}", CACHE_TTL, get_all_subreddits)
 
 
 @app.get("/subreddits/{subreddit}/stats", tags=["Subreddits"])
-def subreddit_stats(subreddit: str):
+async def subreddit_stats(subreddit: str):
     """Get detailed statistics for a subreddit."""
-    stats = get_subreddit_stats(subreddit)
+    stats = await run_in_threadpool(get_subreddit_stats, subreddit)
     if not stats.get('total_posts'):
         raise HTTPException(status_code=404, detail=f"No data for r/{subreddit}")
     return stats
@@ -148,97 +366,155 @@ def subreddit_stats(subreddit: str):
 # --- JOBS ---
 
 @app.get("/jobs", tags=["Jobs"])
-def list_jobs(
+async def list_jobs(
     status: Optional[str] = Query(None, description="Filter by status"),
     target: Optional[str] = Query(None, description="Filter by target"),
     limit: int = Query(50, ge=1, le=200)
 ):
     """Get job history."""
-    return get_job_history(limit=limit, target=target, status=status)
+    return await run_in_threadpool(get_job_history, limit=limit, target=target, status=status)
 
 
 @app.get("/jobs/stats", tags=["Jobs"])
-def job_stats():
+async def job_stats():
     """Get aggregated job statistics."""
-    return get_job_stats()
+    return await cached(f"jobs:stats:{data_version()}", CACHE_TTL, get_job_stats)
+
+
+# --- CACHE ---
+
+@app.post("/cache/invalidate", tags=["Advanced"])
+async def cache_invalidate(prefix: Optional[str] = Query(None, description="Only drop keys with this prefix")):
+    """Drop cached responses, e.g. after a scrape job completes."""
+    return {"invalidated": invalidate(prefix)}
 
 
 # --- RAW SQL (for advanced users) ---
 
+@lru_cache(maxsize=128)
+def _plan(sql):
+    """
+    Validate a raw query and return the SQL template to execute.
+    
+    The template always ends in a bound "LIMIT ?", so every limit value
+    shares one SQLite statement-cache slot. Queries that bring their own
+    top-level LIMIT are wrapped so the API's cap still applies.
+    Comments are stripped first so a trailing "-- ..." can't swallow the
+    appended LIMIT. Cached per distinct SQL text so dashboards re-issuing
+    the same queries skip parsing.
+    """
+    sql = sqlparse.format(sql, strip_comments=True)
+    statements = [stmt for stmt in sqlparse.parse(sql) if str(stmt).strip()]
+    if len(statements) != 1 or statements[0].get_type() != 'SELECT':
+        raise ValueError("Only a single SELECT query is allowed")
+    
+    stmt = statements[0]
+    has_limit = any(
+        tok.ttype is Keyword and tok.normalized == 'LIMIT' for tok in stmt.tokens
+    )
+    normalized = str(stmt).strip().rstrip(';').strip()
+    if has_limit:
+        return f"SELECT * FROM ({normalized}) LIMIT ?"
+    return f"{normalized} LIMIT ?"
+
+
 @app.get("/query", tags=["Advanced"])
-def raw_query(
+async def raw_query(
     sql: str = Query(..., description="SQL SELECT query"),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("records", pattern="^(records|table)$", description="records or columns/rows table")
 ):
     """
     Execute a raw SQL SELECT query.
     
-    ⚠️ Only SELECT queries allowed. Use for custom Grafana/Metabase queries.
+    ⚠️ Only a single read-only SELECT (or WITH ... SELECT) is allowed.
+    Use for custom Grafana/Metabase queries.
     
     Example: /query?sql=SELECT title, score FROM posts ORDER BY score DESC
+    
+    Add &format=table for a compact {"columns": [...], "rows": [[...]]} payload.
     """
-    # Security: Only allow SELECT
-    if not sql.strip().upper().startswith("SELECT"):
-        raise HTTPException(status_code=400, detail="Only SELECT queries allowed")
+    # Security: Only allow a single SELECT statement
+    try:
+        template = _plan(sql)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Add limit if not present
-    if "LIMIT" not in sql.upper():
-        sql = f"{sql} LIMIT {limit}"
+    params = (limit,)
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(sql)
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return {"query": sql, "count": len(results), "results": results}
+        return await stream_query(template, params, envelope={"query": sql}, table=(format == "table"))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Query error: {e}")
 
 
 # --- GRAFANA COMPATIBLE ENDPOINTS ---
 
+def refresh_subreddit_snapshot():
+    """Reload the subreddit name snapshot served to Grafana."""
+    version = data_version()
+    names = [s['subreddit'] for s in get_all_subreddits()]
+    _subreddit_snapshot.update(version=version, names=names)
+    return names
+
+
 @app.get("/grafana/search", tags=["Grafana"])
-def grafana_search():
+async def grafana_search():
     """Grafana SimpleJSON datasource - search endpoint."""
-    subs = get_all_subreddits()
-    return [s['subreddit'] for s in subs]
+    # Served from memory; only re-read when the database files changed
+    if _subreddit_snapshot["version"] != data_version():
+        return await run_in_threadpool(refresh_subreddit_snapshot)
+    return _subreddit_snapshot["names"]
+
+
+@app.post("/_internal/refresh-subreddits", tags=["Advanced"])
+async def refresh_subreddits():
+    """Force a reload of the Grafana subreddit list (e.g. after a scrape job)."""
+    names = await run_in_threadpool(refresh_subreddit_snapshot)
+    return {"subreddits": len(names)}
 
 
 @app.post("/grafana/query", tags=["Grafana"])
-def grafana_query(body: dict):
+async def grafana_query(body: dict):
     """Grafana SimpleJSON datasource - query endpoint."""
     # Return time series data for Grafana
-    results = []
+    subs = [t['target'] for t in body.get('targets', []) if t.get('target')]
+    if not subs:
+        return []
     
-    for target in body.get('targets', []):
-        subreddit = target.get('target')
-        if subreddit:
-            conn = get_connection()
+    def build_series():
+        series = defaultdict(list)
+        placeholders = ",".join("?" * len(subs))
+        
+        # One query for every panel target instead of one per target
+        with checkout() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT date(created_utc) as time, COUNT(*) as value
-                FROM posts WHERE subreddit = ?
-                GROUP BY date(created_utc)
-                ORDER BY time
-            """, (subreddit,))
-            
-            datapoints = [[row['value'], row['time']] for row in cursor.fetchall()]
-            conn.close()
+            cursor.execute(f"""
+                SELECT subreddit, day as time, count as value
+                FROM posts_daily WHERE subreddit IN ({placeholders}) AND count > 0
+                ORDER BY subreddit, day
+            """, subs)
             
-            results.append({
-                "target": subreddit,
-                "datapoints": datapoints
-            })
+            for row in cursor:
+                series[row['subreddit']].append([row['value'], row['time']])
+        
+        return [{"target": sub, "datapoints": series.get(sub, [])} for sub in subs]
     
-    return results
+    # Auto-refresh repeats identical payloads; reuse the last response
+    # until a commit changes the database files.
+    key = f"grafana:query:{subs}:{data_version()}"
+    return await cached(key, GRAFANA_TTL, build_series)
 
 
 # --- CLI ---
 
 if __name__ == "__main__":
+    # Development server (single process). For production use:
+    #   gunicorn api.server:app -c api/gunicorn_conf.py
     import uvicorn
-    print("🚀 Starting Reddit Scraper API...")
+    print("🚀 Starting Reddit Scraper API (dev server)...")
     print("   📖 Docs: http://localhost:8000/docs")
     print("   📊 Use with Metabase, Grafana, or any REST client")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    print("   🏭 Production: gunicorn api.server:app -c api/gunicorn_conf.py")
+    from config import API_HOST, API_PORT, API_LOOP, API_HTTP
+    uvicorn.run(app, host=API_HOST, port=API_PORT, loop=API_LOOP, http=API_HTTP, access_log=False)
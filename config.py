@@ -2,6 +2,7 @@
 Reddit Scraper Suite - Configuration
 """
 import os
+import sys
 from pathlib import Path
 
 # --- PATHS ---
@@ -51,8 +52,23 @@ DASHBOARD_PORT = 8501
 # --- SCHEDULER SETTINGS ---
 SCHEDULER_TIMEZONE = "Asia/Kolkata"
 
+# --- API SETTINGS ---
+API_HOST = "0.0.0.0"
+API_PORT = 8000
+API_WORKERS = int(os.getenv("API_WORKERS", os.cpu_count() or 1))
+API_POOL_SIZE = min(API_WORKERS * 2, 8)
+# uvloop + httptools ship with uvicorn[standard] (uvloop has no Windows build)
+API_LOOP = "asyncio" if sys.platform == "win32" else "uvloop"
+API_HTTP = "httptools"
+# Comma-separated browser origins allowed to call the API ("*" for any)
+API_CORS_ORIGINS = os.getenv("API_CORS_ORIGINS", "http://localhost:3000,http://localhost:8501").split(",")
+
 # --- DATABASE SETTINGS ---
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
 
+# --- EXPORT SETTINGS ---
+# Write large database tables to Parquet on the GPU (needs cudf)
+EXPORT_USE_GPU = os.getenv("REDDIT_USE_GPU") == "1"
+
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
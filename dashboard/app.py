@@ -4,22 +4,36 @@ Run with: streamlit run dashboard/app.py
 """
 import streamlit as st
 import pandas as pd
+import requests
 from pathlib import Path
 import sys
 from datetime import datetime
 import time
+from collections import deque
+import heapq
+from contextlib import redirect_stdout
+import io
 import os
 import json
+import re
 import signal
+import subprocess
+import tempfile
+import zipfile
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from analytics.sentiment import (
-    analyze_posts_sentiment, extract_keywords, 
-    calculate_engagement_metrics, find_best_posting_times
+    count_sentiment, extract_keywords, 
+    calculate_engagement_metrics, best_posting_times
 )
 from search.query import search_all_data, advanced_search, get_top_posts
+from export.database import (
+    backup_database, vacuum_database, get_database_info,
+    get_job_history, get_job_stats
+)
+from export.parquet import export_to_parquet
 
 # Page config
 st.set_page_config(
@@ -58,43 +72,418 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def _categorize(df):
+    """Low-cardinality text as category: dictionary codes make filters and dropdowns cheap."""
+    for col in ('post_type', 'author'):
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    
+    return df
+
+def _read_csv(path):
+    """Parse a CSV with PyArrow's multithreaded reader, falling back to pandas."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return pd.read_csv(path)
+    
+    try:
+        table = pacsv.read_csv(
+            path,
+            # selftext/body are quoted multi-line fields
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            # Keep ISO timestamps as text and empty cells as missing, like pandas
+            convert_options=pacsv.ConvertOptions(
+                column_types={'created_utc': pa.string()},
+                strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid:
+        # Ragged rows from older scrapes: pandas' parser is more forgiving
+        return pd.read_csv(path)
+    return table.to_pandas()
+
+def _parse_csv(path):
+    """Read a scraped CSV and type its columns once."""
+    df = _read_csv(path)
+    
+    # Typed once at load time so the tabs don't re-parse on every rerun.
+    # created_utc stays ISO text (display, analytics); 'date' is the parsed day.
+    if 'created_utc' in df:
+        created = pd.to_datetime(df['created_utc'], format='ISO8601', utc=True, errors='coerce')
+        df['date'] = created.dt.tz_localize(None).values.astype('datetime64[D]')
+    
+    for col in ('score', 'num_comments'):
+        if col in df and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype('int32')
+    
+    return _categorize(df)
+
+@st.cache_data(show_spinner=False)
+def _read_csv_cached(path, mtime):
+    """
+    Load a scraped CSV once per (path, mtime); reruns reuse the cached frame.
+    
+    A typed Parquet copy is kept next to the CSV (posts.csv -> posts.parquet)
+    and preferred while it is at least as new as the CSV, so later sessions
+    skip CSV parsing entirely. The scraper keeps appending to the CSV; a
+    newer CSV simply rebuilds the Parquet copy.
+    """
+    csv_path = Path(path)
+    parquet_path = csv_path.with_suffix('.parquet')
+    
+    try:
+        import pyarrow
+    except ImportError:
+        return _parse_csv(csv_path)
+    
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= mtime:
+        # Copies written before a column was categorised are fixed up here
+        return _categorize(pd.read_parquet(parquet_path, engine="pyarrow"))
+    
+    df = _parse_csv(csv_path)
+    try:
+        tmp_path = parquet_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, engine="pyarrow", compression="snappy", index=False)
+        tmp_path.replace(parquet_path)
+    except (OSError, ValueError, pyarrow.ArrowException):
+        # Read-only data dir or a column Arrow can't type: stay on CSV
+        pass
+    return df
+
+# Analytics are cached on (posts.csv path, mtime) rather than hashing the
+# whole DataFrame; a new scrape bumps the mtime and recomputes.
+@st.cache_data(show_spinner=False)
+def cached_sentiment_counts(path, mtime):
+    """Sentiment counts for a posts.csv."""
+    posts_df = _read_csv_cached(path, mtime)
+    texts = posts_df['title'].fillna('')
+    if 'selftext' in posts_df:
+        texts = texts + ' ' + posts_df['selftext'].fillna('')
+    return count_sentiment(texts.tolist())
+
+@st.cache_data(show_spinner=False)
+def cached_keywords(path, mtime, top_n=30):
+    """Top keywords across post titles and selftext."""
+    posts_df = _read_csv_cached(path, mtime)
+    texts = posts_df['title'].tolist()
+    if 'selftext' in posts_df:
+        texts.extend(posts_df['selftext'].dropna().tolist())
+    return extract_keywords(texts, top_n=top_n)
+
+@st.cache_data(show_spinner=False)
+def cached_posting_times(path, mtime):
+    """Best posting hours/days for a posts.csv."""
+    posts_df = _read_csv_cached(path, mtime)
+    scores = posts_df['score'].tolist() if 'score' in posts_df else [0] * len(posts_df)
+    return best_posting_times(zip(posts_df['created_utc'].tolist(), scores))
+
+@st.cache_data(show_spinner=False)
+def cached_overview_stats(path, mtime):
+    """All Overview-tab aggregates, computed once per posts.csv version."""
+    posts_df = _read_csv_cached(path, mtime)
+    has_score = 'score' in posts_df
+    
+    return {
+        'total_posts': len(posts_df),
+        'total_score': int(posts_df['score'].sum()) if has_score else 0,
+        'avg_score': float(posts_df['score'].mean()) if has_score and len(posts_df) else 0.0,
+        'media_count': int(posts_df['has_media'].sum()) if 'has_media' in posts_df else 0,
+        'type_counts': posts_df['post_type'].value_counts() if 'post_type' in posts_df else None,
+        'daily': posts_df.groupby('date').size() if 'date' in posts_df else None,
+        'top_posts': posts_df.nlargest(10, 'score')[['title', 'score', 'num_comments', 'post_type', 'created_utc']] if has_score else None,
+    }
+
+@st.cache_data(show_spinner=False)
+def cached_search_text(path, mtime):
+    """Lowercased title/selftext, built once so searches are plain substring scans."""
+    posts_df = _read_csv_cached(path, mtime)
+    title_lc = posts_df['title'].str.lower()
+    selftext_lc = posts_df['selftext'].str.lower() if 'selftext' in posts_df else None
+    return title_lc, selftext_lc
+
+def _scan_dir(path):
+    """List files in a directory with their sizes in one scandir pass."""
+    files, total = [], 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.append(Path(entry.path))
+                    total += entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return files, total
+
+def _dir_entries(path, suffix, dirs=False):
+    """scandir entries for files (or directories) ending in suffix ([] if the directory is missing)."""
+    try:
+        with os.scandir(path) as entries:
+            return [e for e in entries if e.name.endswith(suffix) and (e.is_dir() if dirs else e.is_file())]
+    except FileNotFoundError:
+        return []
+
+@st.cache_data(ttl=10, show_spinner=False)
+def scan_media(images_dir, images_mtime, videos_dir, videos_mtime):
+    """Media files and total size, rescanned when either directory changes."""
+    images, images_size = _scan_dir(images_dir)
+    videos, videos_size = _scan_dir(videos_dir)
+    return {'images': images, 'videos': videos, 'total_size': images_size + videos_size}
+
+def posts_to_json(posts_df):
+    """Posts as a JSON array of records (orjson when available)."""
+    # 'date' is derived at load time, not part of the scraped data
+    posts_df = posts_df.drop(columns='date', errors='ignore')
+    try:
+        import orjson
+    except ImportError:
+        return posts_df.to_json(orient='records')
+    return orjson.dumps(posts_df.to_dict('records'))
+
+def build_media_zip(images, videos):
+    """
+    Pack media into an uncompressed ZIP spooled to a temp file.
+    
+    JPEG/MP4/GIF are already compressed, so ZIP_STORED skips the DEFLATE CPU
+    for no size loss; a 1 MB write buffer batches the small chunk writes.
+    Returns a read handle on the archive (st.download_button accepts a
+    BufferedReader, not the temp file's read/write handle).
+    """
+    with tempfile.TemporaryFile(buffering=1 << 20) as tmp:
+        with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_STORED) as zf:
+            for img in images:
+                zf.write(img, f"images/{img.name}")
+            for vid in videos:
+                zf.write(vid, f"videos/{vid.name}")
+        tmp.flush()
+        # The duplicate descriptor keeps the (already unlinked) file alive
+        return open(os.dup(tmp.fileno()), 'rb', buffering=1 << 20)
+
 def load_subreddit_data(subreddit_path):
     """Load all data for a subreddit."""
     data = {}
     
     posts_file = subreddit_path / 'posts.csv'
     if posts_file.exists():
-        data['posts'] = pd.read_csv(posts_file)
+        data['posts'] = _read_csv_cached(str(posts_file), posts_file.stat().st_mtime)
     
     comments_file = subreddit_path / 'comments.csv'
     if comments_file.exists():
-        data['comments'] = pd.read_csv(comments_file)
+        data['comments'] = _read_csv_cached(str(comments_file), comments_file.stat().st_mtime)
     
     return data
 
+@st.cache_data(ttl=5, show_spinner=False)
 def get_available_data():
-    """Get list of scraped subreddits and users."""
+    """Get list of scraped subreddits and users (rescanned at most every 5s)."""
     data_dir = Path(__file__).parent.parent / 'data'
     data = {'subreddits': [], 'users': []}
     
     if data_dir.exists():
-        for sub_dir in data_dir.iterdir():
-            if sub_dir.is_dir():
+        with os.scandir(data_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
                 # Check for r_ or u_ prefix (standard scraper format)
                 # We allow folders even without posts.csv so users can see empty scrapes
-                if sub_dir.name.startswith('u_'):
-                    data['users'].append(sub_dir.name)
-                elif sub_dir.name.startswith('r_'):
-                    data['subreddits'].append(sub_dir.name)
-                elif (sub_dir / 'posts.csv').exists():
+                if entry.name.startswith('u_'):
+                    data['users'].append(entry.name)
+                elif entry.name.startswith('r_'):
+                    data['subreddits'].append(entry.name)
+                elif os.path.exists(os.path.join(entry.path, 'posts.csv')):
                     # Fallback for old/other folders that have data
-                    data['subreddits'].append(sub_dir.name)
+                    data['subreddits'].append(entry.name)
     
     # Sort lists
     data['subreddits'].sort()
     data['users'].sort()
     return data
 
+# Scraper job persistence (relative to the launch directory)
+JOB_FILE = Path("active_job.json")
+LOG_DIR = Path("logs")
+
+def get_active_job():
+    """The running scraper job recorded by the Scraper tab, if any."""
+    if JOB_FILE.exists():
+        try:
+            with open(JOB_FILE, "r") as f:
+                return json.load(f)
+        except:
+            return None
+    return None
+
+def is_process_alive(pid):
+    """Check whether the scraper subprocess is still running."""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        # Fallback for systems without psutil
+        try:
+            os.kill(pid, 0)
+            return True
+        except OSError:
+            return False
+
+def new_log_metrics():
+    """Fresh counters for a scraper log."""
+    return {
+        'posts_saved': 0, 'comments': 0, 'images': 0, 'videos': 0,
+        'found_posts': 0, 'processed_posts': 0,
+    }
+
+# One alternation so each log line is scanned once; the outer named group
+# tells which event matched and the inner groups carry its numbers. The
+# line-anchored prefix lets finditer() take the first event of every line
+# in a whole chunk of text without a Python-level loop over lines.
+LOG_RE = re.compile(
+    r'^[^\n]*?(?:'
+    r'(?P<prog>Progress: (\d+)/(\d+))'
+    r'|(?P<saved>Saved (\d+))'
+    r'|(?P<found>Found (\d+) posts)'
+    r'|(?P<fetch>Fetching comments for(?::| (\d+) posts))'
+    r'|(?P<csum>Comments:\s*(\d+))'
+    r'|(?P<cinc>\+ Scraped (\d+) comments)'
+    r'|(?P<imv>Images:\s*(\d+).*Videos:\s*(\d+))'
+    r'|(?P<imvrt>\+ Downloaded: (\d+) images, (\d+) videos)'
+    r')',
+    re.MULTILINE,
+)
+
+def _log_prog(metrics, saved, total):
+    metrics['posts_saved'] = int(saved)
+
+def _log_saved(metrics, n):
+    metrics['posts_saved'] += int(n)
+
+def _log_found(metrics, n):
+    metrics['found_posts'] += int(n)
+
+def _log_fetch(metrics, n):
+    # One line per post, or one per batch with the post count
+    metrics['processed_posts'] += int(n) if n else 1
+
+def _log_csum(metrics, n):
+    metrics['comments'] = int(n)
+
+def _log_cinc(metrics, n):
+    metrics['comments'] += int(n)
+
+def _log_imv(metrics, images, videos):
+    metrics['images'] = int(images)
+    metrics['videos'] = int(videos)
+
+def _log_imvrt(metrics, images, videos):
+    metrics['images'] += int(images)
+    metrics['videos'] += int(videos)
+
+# event -> (handler, number of inner groups)
+LOG_HANDLERS = {
+    'prog': (_log_prog, 2), 'saved': (_log_saved, 1), 'found': (_log_found, 1),
+    'fetch': (_log_fetch, 1), 'csum': (_log_csum, 1), 'cinc': (_log_cinc, 1),
+    'imv': (_log_imv, 2), 'imvrt': (_log_imvrt, 2),
+}
+# event -> (handler, slice of m.groups() holding its numbers)
+_LOG_DISPATCH = {
+    name: (handler, slice(LOG_RE.groupindex[name], LOG_RE.groupindex[name] + arity))
+    for name, (handler, arity) in LOG_HANDLERS.items()
+}
+
+def parse_log_text(text, metrics):
+    """Fold a chunk of complete log lines into the running metrics dict."""
+    # The regex engine skips non-matching lines; Python only runs per event
+    for m in LOG_RE.finditer(text):
+        handler, args = _LOG_DISPATCH[m.lastgroup]
+        handler(metrics, *m.groups()[args])
+
+def tail_log(log_file):
+    """
+    Read only the bytes appended since the last tick and update the metrics.
+    
+    State lives in st.session_state['log_tail'] and is reset when the job's
+    log file changes (or the file is truncated).
+    """
+    state = st.session_state.get('log_tail')
+    if state is None or state['path'] != str(log_file) or log_file.stat().st_size < state['offset']:
+        state = {
+            'path': str(log_file), 'offset': 0, 'partial': b'',
+            'metrics': new_log_metrics(), 'recent': deque(maxlen=20),
+        }
+        st.session_state['log_tail'] = state
+    
+    # One large buffered read of the appended bytes, decoded as a block below
+    with open(log_file, "rb", buffering=1 << 16) as f:
+        f.seek(state['offset'])
+        new = f.read()
+    state['offset'] += len(new)
+    
+    # Keep a trailing half-written line for the next tick
+    complete, newline, state['partial'] = (state['partial'] + new).rpartition(b"\n")
+    if not newline:
+        return state
+    text = complete.decode("utf-8", errors="replace")
+    
+    parse_log_text(text, state['metrics'])
+    # Only the last 20 lines of the new text can end up on screen
+    state['recent'].extend(text.rsplit("\n", 20)[-20:])
+    return state
+
+@st.fragment(run_every=1)
+def render_job_monitor(active_job, job_file):
+    """Live metrics + log tail; reruns on its own timer without touching the rest of the page."""
+    # Job finished or was stopped: rerun the whole app to show the start UI again
+    if not job_file.exists() or not is_process_alive(active_job['pid']):
+        st.rerun()
+    
+    log_file = Path(active_job['log_file'])
+    if not log_file.exists():
+        st.warning("Log file not found.")
+        return
+    
+    state = tail_log(log_file)
+    metrics = state['metrics']
+    
+    # Display Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # Posts Metric Logic
+    if metrics['posts_saved'] > 0:
+         col1.metric("📊 Posts", f"{metrics['posts_saved']} (Found {metrics['found_posts']})")
+    elif metrics['found_posts'] > 0:
+         col1.metric("📊 Posts", f"Processing: {metrics['processed_posts']}/{metrics['found_posts']}")
+    else:
+         col1.metric("📊 Posts", "0")
+    
+    col2.metric("💬 Comments", metrics['comments'])
+    col3.metric("🖼️ Images", metrics['images'])
+    col4.metric("🎬 Videos", metrics['videos'])
+    
+    # Show latest logs
+    st.code("\n".join(state['recent']), language="text")
+
+@st.cache_resource(show_spinner=False)
+def get_plugins():
+    """Plugin instances, loaded once per server process instead of re-exec'd every rerun."""
+    from plugins import load_plugins
+    return load_plugins()
+
+@st.cache_data(ttl=5, show_spinner=False)
+def api_health(port):
+    """Status code of the local API's /health, or None if unreachable (cached 5s)."""
+    try:
+        return requests.get(f"http://localhost:{port}/health", timeout=0.3).status_code
+    except requests.RequestException:
+        return None
+
+def run_captured(fn, *args, **kwargs):
+    """Call fn in-process, returning (result, what it printed) for display."""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        result = fn(*args, **kwargs)
+    return result, buf.getvalue()
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🤖 Reddit Scraper Dashboard</h1>', unsafe_allow_html=True)
@@ -103,7 +492,7 @@ def main():
     st.sidebar.title("📊 Navigation")
     
     if st.sidebar.button("🔄 Refresh List"):
-        st.rerun()
+        get_available_data.clear()
     
     # Get available data
     available_data = get_available_data()
@@ -155,6 +544,8 @@ def main():
         data = load_subreddit_data(sub_path)
         
         if 'posts' in data:
+            posts_file = sub_path / 'posts.csv'
+            posts_key = (str(posts_file), posts_file.stat().st_mtime)
             posts_df = data['posts']
             comments_df = data.get('comments', pd.DataFrame())
             data_loaded = True
@@ -170,8 +561,8 @@ def main():
     # Always present tabs
     tab_list.extend(["⚙️ Scraper", "📋 Job History", "🔌 Integrations"])
     
-    # Create tabs
-    tabs = st.tabs(tab_list)
+    # Create tabs (rerun on switch so tab.open tells which one is showing)
+    tabs = st.tabs(tab_list, key="main_tabs", on_change="rerun")
     
     # Map tabs to variables for easy access
     tab_map = {name: tabs[i] for i, name in enumerate(tab_list)}
@@ -185,19 +576,18 @@ def main():
             # Metrics row
             col1, col2, col3, col4, col5 = st.columns(5)
             
+            stats = cached_overview_stats(*posts_key)
+            
             with col1:
-                st.metric("Total Posts", len(posts_df))
+                st.metric("Total Posts", stats['total_posts'])
             with col2:
                 st.metric("Total Comments", len(comments_df))
             with col3:
-                total_score = posts_df['score'].sum() if 'score' in posts_df else 0
-                st.metric("Total Score", f"{total_score:,}")
+                st.metric("Total Score", f"{stats['total_score']:,}")
             with col4:
-                avg_score = posts_df['score'].mean() if 'score' in posts_df else 0
-                st.metric("Avg Score", f"{avg_score:.1f}")
+                st.metric("Avg Score", f"{stats['avg_score']:.1f}")
             with col5:
-                media_count = posts_df['has_media'].sum() if 'has_media' in posts_df else 0
-                st.metric("Media Posts", int(media_count))
+                st.metric("Media Posts", stats['media_count'])
             
             st.divider()
             
@@ -206,24 +596,20 @@ def main():
             
             with col1:
                 st.subheader("📝 Post Types")
-                if 'post_type' in posts_df:
-                    type_counts = posts_df['post_type'].value_counts()
-                    st.bar_chart(type_counts)
+                if stats['type_counts'] is not None:
+                    st.bar_chart(stats['type_counts'])
             
             with col2:
                 st.subheader("📅 Posts Over Time")
-                if 'created_utc' in posts_df:
-                    posts_df['date'] = pd.to_datetime(posts_df['created_utc']).dt.date
-                    daily = posts_df.groupby('date').size()
-                    st.line_chart(daily)
+                if stats['daily'] is not None:
+                    st.line_chart(stats['daily'])
             
             st.divider()
             
             # Top posts
             st.subheader("🔥 Top Posts by Score")
-            if 'score' in posts_df:
-                top_posts = posts_df.nlargest(10, 'score')[['title', 'score', 'num_comments', 'post_type', 'created_utc']]
-                st.dataframe(top_posts)
+            if stats['top_posts'] is not None:
+                st.dataframe(stats['top_posts'])
 
         with tab_map["📈 Analytics"]:
             st.header("📈 Analytics")
@@ -233,8 +619,7 @@ def main():
             
             if st.button("Run Sentiment Analysis"):
                 with st.spinner("Analyzing sentiment..."):
-                    posts_list = posts_df.to_dict('records')
-                    analyzed_posts, sentiment_counts = analyze_posts_sentiment(posts_list)
+                    sentiment_counts = cached_sentiment_counts(*posts_key)
                     
                     col1, col2, col3 = st.columns(3)
                     col1.metric("Positive", sentiment_counts['positive'], delta=None)
@@ -252,15 +637,12 @@ def main():
             
             # Keywords
             st.subheader("☁️ Top Keywords")
-            texts = posts_df['title'].tolist()
-            if 'selftext' in posts_df:
-                texts.extend(posts_df['selftext'].dropna().tolist())
-            
-            keywords = extract_keywords(texts, top_n=30)
-            
-            if keywords:
-                kw_df = pd.DataFrame(keywords, columns=['Word', 'Count'])
-                st.bar_chart(kw_df.set_index('Word').head(20))
+            if st.button("Extract Keywords"):
+                keywords = cached_keywords(*posts_key, top_n=30)
+                
+                if keywords:
+                    kw_df = pd.DataFrame(keywords, columns=['Word', 'Count'])
+                    st.bar_chart(kw_df.set_index('Word').head(20))
             
             st.divider()
             
@@ -268,7 +650,7 @@ def main():
             st.subheader("⏰ Best Posting Times")
             
             if 'created_utc' in posts_df:
-                timing_data = find_best_posting_times(posts_df.to_dict('records'))
+                timing_data = cached_posting_times(*posts_key)
                 
                 if timing_data['best_hours']:
                     st.write("**Best Hours to Post:**")
@@ -296,12 +678,12 @@ def main():
             
             with col3:
                 if 'post_type' in posts_df:
-                    post_types = ['All'] + posts_df['post_type'].dropna().unique().tolist()
+                    post_types = ['All'] + posts_df['post_type'].cat.categories.tolist()
                     selected_type = st.selectbox("Post Type", post_types)
             
             with col4:
                 if 'author' in posts_df:
-                    authors = ['All'] + posts_df['author'].dropna().unique().tolist()[:50]
+                    authors = ['All'] + posts_df['author'].cat.categories[:50].tolist()
                     selected_author = st.selectbox("Author", authors)
             
             with col5:
@@ -309,12 +691,14 @@ def main():
             
             # Search button
             if st.button("🔍 Search"):
-                filtered = posts_df.copy()
+                filtered = posts_df
                 
                 if search_query:
-                    mask = filtered['title'].str.contains(search_query, case=False, na=False)
-                    if 'selftext' in filtered:
-                        mask |= filtered['selftext'].str.contains(search_query, case=False, na=False)
+                    q = search_query.lower()
+                    title_lc, selftext_lc = cached_search_text(*posts_key)
+                    mask = title_lc.str.contains(q, regex=False, na=False)
+                    if selftext_lc is not None:
+                        mask |= selftext_lc.str.contains(q, regex=False, na=False)
                     filtered = filtered[mask]
                 
                 if min_score > 0:
@@ -353,10 +737,11 @@ def main():
                 # Top comments
                 st.subheader("🔥 Top Comments by Score")
                 if 'score' in comments_df:
-                    top_comments = comments_df.nlargest(10, 'score')[['body', 'score', 'author', 'created_utc']]
-                    for _, row in top_comments.iterrows():
-                        with st.expander(f"⬆️ {row['score']} - by u/{row['author']}"):
-                            st.write(row['body'][:500])
+                    top_comments = comments_df.nlargest(10, 'score')
+                    previews = top_comments['body'].fillna('').str.slice(0, 500)
+                    for score, author, preview in zip(top_comments['score'], top_comments['author'], previews):
+                        with st.expander(f"⬆️ {score} - by u/{author}"):
+                            st.write(preview)
                 
                 st.divider()
                 
@@ -371,46 +756,17 @@ def main():
 
         st.header("⚙️ Scraper Controls")
         
-        # Persistence logic
-        import json
-        import signal
-        
-        JOB_FILE = Path("active_job.json")
-        LOG_DIR = Path("logs")
         LOG_DIR.mkdir(exist_ok=True)
 
-        def get_active_job():
-            if JOB_FILE.exists():
-                try:
-                    with open(JOB_FILE, "r") as f:
-                        return json.load(f)
-                except:
-                    return None
-            return None
-
         # Check for active job
         active_job = get_active_job()
         
         # Auto-detect if process is dead
-        if active_job:
-            try:
-                import psutil
-                if not psutil.pid_exists(active_job['pid']):
-                    # Process is dead
-                    if JOB_FILE.exists():
-                        JOB_FILE.unlink()
-                    active_job = None
-                    st.rerun()
-            except ImportError:
-                # Fallback for systems without psutil
-                try:
-                    os.kill(active_job['pid'], 0)
-                except OSError:
-                    # PID doesn't exist (Process dead)
-                    if JOB_FILE.exists():
-                        JOB_FILE.unlink()
-                    active_job = None
-                    st.rerun()
+        if active_job and not is_process_alive(active_job['pid']):
+            if JOB_FILE.exists():
+                JOB_FILE.unlink()
+            active_job = None
+            st.rerun()
         
         # Monitor Section (Always visible if job exists)
         if active_job:
@@ -419,7 +775,6 @@ def main():
             # Stop button
             if st.button("🛑 Stop Scraping"):
                 try:
-                    import signal
                     os.kill(active_job['pid'], signal.SIGTERM)
                     st.warning("Stopped process.")
                 except:
@@ -429,82 +784,7 @@ def main():
                     JOB_FILE.unlink()
                 st.rerun()
             
-            # Read logs
-            log_file = Path(active_job['log_file'])
-            if log_file.exists():
-                with open(log_file, "r", encoding="utf-8", errors="replace") as f:
-                    lines = f.readlines()
-                
-                # Parse metrics from lines
-                posts_saved = 0
-                comments_count = 0
-                images_count = 0
-                videos_count = 0
-                found_posts = 0
-                processed_posts = 0
-                
-                for line in lines:
-                    import re
-                    # Progress: X/Y (Saved posts)
-                    m = re.search(r'Progress: (\d+)/(\d+)', line)
-                    if m: posts_saved = int(m.group(1))
-                    
-                    # Saved X posts
-                    m = re.search(r'Saved (\d+)', line)
-                    if m: posts_saved += int(m.group(1))
-                    
-                    # Found X posts
-                    m = re.search(r'Found (\d+) posts', line)
-                    if m: found_posts += int(m.group(1))
-                    
-                    # Processed posts (Fetching comments)
-                    if "Fetching comments for:" in line: 
-                        processed_posts += 1
-                    
-                    # Comments: X (Summary)
-                    m = re.search(r'Comments:\s*(\d+)', line)
-                    if m: 
-                        comments_count = int(m.group(1))
-                    else:
-                        # Incremental comments
-                        m = re.search(r'\+ Scraped (\d+) comments', line)
-                        if m: comments_count += int(m.group(1))
-                    
-                    # Images/Videos (Summary line)
-                    m = re.search(r'Images:\s*(\d+).*Videos:\s*(\d+)', line)
-                    if m:
-                        images_count = int(m.group(1))
-                        videos_count = int(m.group(2))
-                    
-                    # Images/Videos (Real-time line)
-                    m = re.search(r'\+ Downloaded: (\d+) images, (\d+) videos', line)
-                    if m:
-                        images_count += int(m.group(1))
-                        videos_count += int(m.group(2))
-
-                # Display Metrics
-                col1, col2, col3, col4 = st.columns(4)
-                
-                # Posts Metric Logic
-                if posts_saved > 0:
-                     col1.metric("📊 Posts", f"{posts_saved} (Found {found_posts})")
-                elif found_posts > 0:
-                     col1.metric("📊 Posts", f"Processing: {processed_posts}/{found_posts}")
-                else:
-                     col1.metric("📊 Posts", "0")
-                
-                col2.metric("💬 Comments", comments_count)
-                col3.metric("🖼️ Images", images_count)
-                col4.metric("🎬 Videos", videos_count)
-                
-                # Show latest logs
-                st.code("".join(lines[-20:]), language="text")
-                
-                # Auto-refresh
-                time.sleep(1)
-                st.rerun()
-            else:
-                st.warning("Log file not found.")
+            render_job_monitor(active_job, JOB_FILE)
                 
         else:
             # Start New Scrape UI
@@ -532,9 +812,6 @@ def main():
                     if no_comments: target_cmd.append("--no-comments")
                     
                     # Start background process
-                    import subprocess
-                    import os
-                    
                     job_id = f"job_{int(time.time())}"
                     log_file = LOG_DIR / f"{job_id}.log"
                     
@@ -542,6 +819,8 @@ def main():
                         with open(log_file, "w", encoding="utf-8") as f:
                             env = os.environ.copy()
                             env['PYTHONIOENCODING'] = 'utf-8'
+                            # The child writes straight to the inherited fd; unbuffered
+                            # output keeps the live monitor current line by line
                             env['PYTHONUNBUFFERED'] = '1'
                             
                             process = subprocess.Popen(
@@ -578,23 +857,25 @@ def main():
             
             export_format = st.selectbox("Format", ['CSV', 'JSON', 'Excel'])
             
-            if st.button("📥 Download Posts"):
-                if export_format == 'CSV':
-                    csv = posts_df.to_csv(index=False)
-                    st.download_button(
-                        "Download CSV",
-                        csv,
-                        f"{selected_sub}_posts.csv",
-                        "text/csv"
-                    )
-                elif export_format == 'JSON':
-                    json_data = posts_df.to_json(orient='records', indent=2)
-                    st.download_button(
-                        "Download JSON",
-                        json_data,
-                        f"{selected_sub}_posts.json",
-                        "application/json"
-                    )
+            # Serialized on a worker thread only when the download is clicked
+            if not data_loaded:
+                st.info("No posts to export yet.")
+            elif export_format == 'CSV':
+                st.download_button(
+                    "📥 Download Posts",
+                    lambda: Path(posts_key[0]).read_bytes(),
+                    f"{selected_sub}_posts.csv",
+                    "text/csv",
+                    on_click="ignore"
+                )
+            elif export_format == 'JSON':
+                st.download_button(
+                    "📥 Download Posts",
+                    lambda: posts_to_json(posts_df),
+                    f"{selected_sub}_posts.json",
+                    "application/json",
+                    on_click="ignore"
+                )
             
             st.divider()
             
@@ -606,8 +887,11 @@ def main():
                 images_dir = media_dir / "images"
                 videos_dir = media_dir / "videos"
                 
-                images = list(images_dir.glob("*")) if images_dir.exists() else []
-                videos = list(videos_dir.glob("*")) if videos_dir.exists() else []
+                media = scan_media(
+                    str(images_dir), images_dir.stat().st_mtime if images_dir.exists() else 0,
+                    str(videos_dir), videos_dir.stat().st_mtime if videos_dir.exists() else 0,
+                )
+                images, videos = media['images'], media['videos']
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -615,28 +899,18 @@ def main():
                 with col2:
                     st.metric("🎬 Videos", len(videos))
                 with col3:
-                    total_size = sum(f.stat().st_size for f in images + videos) / (1024 * 1024)
+                    total_size = media['total_size'] / (1024 * 1024)
                     st.metric("💾 Total Size", f"{total_size:.1f} MB")
                 
                 if images or videos:
-                    if st.button("📦 Download All Media (ZIP)"):
-                        import zipfile
-                        import io
-                        
-                        zip_buffer = io.BytesIO()
-                        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-                            for img in images:
-                                zf.write(img, f"images/{img.name}")
-                            for vid in videos:
-                                zf.write(vid, f"videos/{vid.name}")
-                        
-                        st.download_button(
-                            "💾 Download ZIP",
-                            zip_buffer.getvalue(),
-                            f"{selected_sub}_media.zip",
-                            "application/zip"
-                        )
-                        st.success(f"✅ ZIP ready: {len(images)} images, {len(videos)} videos")
+                    # Built on a worker thread only when clicked
+                    st.download_button(
+                        "📦 Download All Media (ZIP)",
+                        lambda: build_media_zip(images, videos),
+                        f"{selected_sub}_media.zip",
+                        "application/zip",
+                        on_click="ignore"
+                    )
                     
                     # Preview recent images
                     if images:
@@ -652,301 +926,290 @@ def main():
                 st.info(f"No media found for {selected_sub}. Run with `--mode full` to download media.")
     
     with tab_map["📋 Job History"]:
-        st.header("📋 Job History")
-        
-        try:
-            from export.database import get_job_history, get_job_stats
+        # Only the selected tab runs its DB queries / network probes
+        if tab_map["📋 Job History"].open:
+            st.header("📋 Job History")
+            
+            try:
+                # Job stats
+                stats = get_job_stats()
+                
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Jobs", stats.get('total_jobs', 0))
+                with col2:
+                    st.metric("Completed", stats.get('completed', 0))
+                with col3:
+                    st.metric("Failed", stats.get('failed', 0))
+                with col4:
+                    avg_dur = stats.get('avg_duration')
+                    st.metric("Avg Duration", f"{avg_dur:.1f}s" if avg_dur else "-")
+                
+                st.divider()
+                
+                # Job history table
+                st.subheader("Recent Jobs")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    filter_status = st.selectbox("Filter by Status", ['All', 'completed', 'failed', 'running'])
+                with col2:
+                    limit = st.number_input("Show last N jobs", min_value=10, max_value=100, value=20)
+                
+                status_filter = None if filter_status == 'All' else filter_status
+                jobs = get_job_history(limit=limit, status=status_filter)
+                
+                if jobs:
+                    jobs_df = pd.DataFrame(jobs)
+                    # Format for display
+                    display_cols = ['job_id', 'target', 'mode', 'status', 'posts_scraped', 
+                                   'comments_scraped', 'duration_seconds', 'started_at', 'dry_run']
+                    display_cols = [c for c in display_cols if c in jobs_df.columns]
+                    st.dataframe(jobs_df[display_cols])
+                    
+                    # Success rate chart
+                    st.subheader("Success Rate")
+                    if 'status' in jobs_df.columns:
+                        status_counts = jobs_df['status'].value_counts()
+                        st.bar_chart(status_counts)
+                else:
+                    st.info("No job history found. Run some scrapes first!")
+            
+            except Exception as e:
+                st.error(f"Failed to load job history: {e}")
+                st.info("Make sure the database is initialized.")
+    
+    with tab_map["🔌 Integrations"]:
+        if tab_map["🔌 Integrations"].open:
+            st.header("🔌 Integrations & Settings")
             
-            # Job stats
-            stats = get_job_stats()
+            # REST API Section
+            st.subheader("🚀 REST API")
             
-            col1, col2, col3, col4 = st.columns(4)
+            col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Total Jobs", stats.get('total_jobs', 0))
+                api_port = st.number_input("API Port", value=8000, min_value=1000, max_value=65535)
+            
             with col2:
-                st.metric("Completed", stats.get('completed', 0))
+                if st.button("🚀 Start API Server"):
+                    st.info("Starting API server in background...")
+                    try:
+                        # Start API in background (non-blocking)
+                        subprocess.Popen(
+                            ["python", "main.py", "--api"],
+                            cwd=str(Path(__file__).parent.parent),
+                            creationflags=subprocess.CREATE_NEW_CONSOLE if hasattr(subprocess, 'CREATE_NEW_CONSOLE') else 0
+                        )
+                        st.success(f"✅ API server starting on port {api_port}!")
+                        st.markdown(f"**Open:** [http://localhost:{api_port}/docs](http://localhost:{api_port}/docs)")
+                    except Exception as e:
+                        st.error(f"❌ Failed to start API: {e}")
+            
             with col3:
-                st.metric("Failed", stats.get('failed', 0))
-            with col4:
-                avg_dur = stats.get('avg_duration')
-                st.metric("Avg Duration", f"{avg_dur:.1f}s" if avg_dur else "-")
+                # Check if API is running
+                status = api_health(api_port)
+                if status == 200:
+                    st.success("🟢 API is running")
+                elif status is not None:
+                    st.warning("🟡 API responded but not healthy")
+                else:
+                    st.info("🔴 API not running")
+            
+            st.markdown("""
+            **Available Endpoints:**
+            | Endpoint | Description |
+            |----------|-------------|
+            | `/posts` | List posts with filters |
+            | `/comments` | List comments |
+            | `/subreddits` | All scraped subreddits |
+            | `/jobs` | Job history |
+            | `/query?sql=...` | Raw SQL queries |
+            | `/docs` | Interactive Swagger UI |
+            """)
             
             st.divider()
             
-            # Job history table
-            st.subheader("Recent Jobs")
+            # External Tools
+            st.subheader("📊 External Tools Integration")
+            
+            tool_tabs = st.tabs(["📈 Metabase", "📊 Grafana", "🔗 DreamFactory", "🧦 DuckDB"])
+            
+            with tool_tabs[0]:
+                st.markdown("""
+                **Metabase Setup:**
+                1. Start API: `python main.py --api`
+                2. In Metabase: New Question → Native Query
+                3. Use HTTP datasource with `http://localhost:8000`
+                4. Query: `/posts?subreddit=python&limit=100`
+                
+                **Or use raw SQL:**
+                ```
+                /query?sql=SELECT title, score FROM posts ORDER BY score DESC
+                ```
+                """)
+            
+            with tool_tabs[1]:
+                st.markdown("""
+                **Grafana Setup:**
+                1. Install "JSON API" or "Infinity" plugin
+                2. Add datasource: `http://localhost:8000`
+                3. Use `/grafana/query` for time-series
+                
+                **Example Panel Query:**
+                ```sql
+                SELECT date(created_utc) as time, COUNT(*) as posts 
+                FROM posts GROUP BY date(created_utc)
+                ```
+                """)
+            
+            with tool_tabs[2]:
+                st.markdown("""
+                **DreamFactory Setup:**
+                1. Point to SQLite file: `data/reddit_scraper.db`
+                2. Or use REST API: `http://localhost:8000`
+                3. Auto-generates API for all tables
+                """)
+            
+            with tool_tabs[3]:
+                st.markdown("""
+                **DuckDB (Analytics):**
+                1. Export to Parquet first (see below)
+                2. Query directly:
+                ```python
+                import duckdb
+                duckdb.query("SELECT * FROM 'data/parquet/*.parquet'").df()
+                ```
+                """)
+            
+            st.divider()
+            
+            # Parquet Export
+            st.subheader("📦 Parquet Export")
+            
+            all_targets = available_data['subreddits'] + available_data['users']
             
             col1, col2 = st.columns(2)
             with col1:
-                filter_status = st.selectbox("Filter by Status", ['All', 'completed', 'failed', 'running'])
+                export_sub = st.selectbox("Select target to export", all_targets, key="parquet_export")
             with col2:
-                limit = st.number_input("Show last N jobs", min_value=10, max_value=100, value=20)
-            
-            status_filter = None if filter_status == 'All' else filter_status
-            jobs = get_job_history(limit=limit, status=status_filter)
-            
-            if jobs:
-                jobs_df = pd.DataFrame(jobs)
-                # Format for display
-                display_cols = ['job_id', 'target', 'mode', 'status', 'posts_scraped', 
-                               'comments_scraped', 'duration_seconds', 'started_at', 'dry_run']
-                display_cols = [c for c in display_cols if c in jobs_df.columns]
-                st.dataframe(jobs_df[display_cols])
-                
-                # Success rate chart
-                st.subheader("Success Rate")
-                if 'status' in jobs_df.columns:
-                    status_counts = jobs_df['status'].value_counts()
-                    st.bar_chart(status_counts)
-            else:
-                st.info("No job history found. Run some scrapes first!")
-        
-        except Exception as e:
-            st.error(f"Failed to load job history: {e}")
-            st.info("Make sure the database is initialized.")
-    
-    with tab_map["🔌 Integrations"]:
-        st.header("🔌 Integrations & Settings")
-        
-        # REST API Section
-        st.subheader("🚀 REST API")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            api_port = st.number_input("API Port", value=8000, min_value=1000, max_value=65535)
-        
-        with col2:
-            if st.button("🚀 Start API Server"):
-                st.info("Starting API server in background...")
-                import subprocess
-                try:
-                    # Start API in background (non-blocking)
-                    subprocess.Popen(
-                        ["python", "main.py", "--api"],
-                        cwd=str(Path(__file__).parent.parent),
-                        creationflags=subprocess.CREATE_NEW_CONSOLE if hasattr(subprocess, 'CREATE_NEW_CONSOLE') else 0
-                    )
-                    st.success(f"✅ API server starting on port {api_port}!")
-                    st.markdown(f"**Open:** [http://localhost:{api_port}/docs](http://localhost:{api_port}/docs)")
-                except Exception as e:
-                    st.error(f"❌ Failed to start API: {e}")
-        
-        with col3:
-            # Check if API is running
-            import requests
-            try:
-                resp = requests.get(f"http://localhost:{api_port}/health", timeout=1)
-                if resp.status_code == 200:
-                    st.success("🟢 API is running")
-                else:
-                    st.warning("🟡 API responded but not healthy")
-            except:
-                st.info("🔴 API not running")
-        
-        st.markdown("""
-        **Available Endpoints:**
-        | Endpoint | Description |
-        |----------|-------------|
-        | `/posts` | List posts with filters |
-        | `/comments` | List comments |
-        | `/subreddits` | All scraped subreddits |
-        | `/jobs` | Job history |
-        | `/query?sql=...` | Raw SQL queries |
-        | `/docs` | Interactive Swagger UI |
-        """)
-        
-        st.divider()
-        
-        # External Tools
-        st.subheader("📊 External Tools Integration")
-        
-        tool_tabs = st.tabs(["📈 Metabase", "📊 Grafana", "🔗 DreamFactory", "🧦 DuckDB"])
-        
-        with tool_tabs[0]:
-            st.markdown("""
-            **Metabase Setup:**
-            1. Start API: `python main.py --api`
-            2. In Metabase: New Question → Native Query
-            3. Use HTTP datasource with `http://localhost:8000`
-            4. Query: `/posts?subreddit=python&limit=100`
-            
-            **Or use raw SQL:**
-            ```
-            /query?sql=SELECT title, score FROM posts ORDER BY score DESC
-            ```
-            """)
-        
-        with tool_tabs[1]:
-            st.markdown("""
-            **Grafana Setup:**
-            1. Install "JSON API" or "Infinity" plugin
-            2. Add datasource: `http://localhost:8000`
-            3. Use `/grafana/query` for time-series
-            
-            **Example Panel Query:**
-            ```sql
-            SELECT date(created_utc) as time, COUNT(*) as posts 
-            FROM posts GROUP BY date(created_utc)
-            ```
-            """)
-        
-        with tool_tabs[2]:
-            st.markdown("""
-            **DreamFactory Setup:**
-            1. Point to SQLite file: `data/reddit_scraper.db`
-            2. Or use REST API: `http://localhost:8000`
-            3. Auto-generates API for all tables
-            """)
-        
-        with tool_tabs[3]:
-            st.markdown("""
-            **DuckDB (Analytics):**
-            1. Export to Parquet first (see below)
-            2. Query directly:
-            ```python
-            import duckdb
-            duckdb.query("SELECT * FROM 'data/parquet/*.parquet'").df()
-            ```
-            """)
-        
-        st.divider()
-        
-        # Parquet Export
-        st.subheader("📦 Parquet Export")
-        
-        all_targets = available_data['subreddits'] + available_data['users']
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            export_sub = st.selectbox("Select target to export", all_targets, key="parquet_export")
-        with col2:
-            if st.button("📦 Export to Parquet"):
-                if export_sub:
-                    target_name = export_sub.replace('r_', '').replace('u_', '')
-                    with st.spinner(f"Exporting {target_name} to Parquet..."):
-                        import subprocess
-                        result = subprocess.run(
-                            ["python", "main.py", "--export-parquet", target_name],
-                            capture_output=True,
-                            text=True,
-                            cwd=str(Path(__file__).parent.parent)
-                        )
-                        if result.returncode == 0:
-                            st.success(f"✅ Exported {target_name} to Parquet!")
-                            st.code(result.stdout[-500:] if len(result.stdout) > 500 else result.stdout)
-                        else:
-                            st.error(f"❌ Export failed: {result.stderr}")
-                else:
-                    st.error("Select a target first")
-        
-        # List existing parquet files
-        parquet_dir = Path("data/parquet")
-        if parquet_dir.exists():
-            parquet_files = list(parquet_dir.glob("*.parquet"))
+                if st.button("📦 Export to Parquet"):
+                    if export_sub:
+                        target_name = export_sub.replace('r_', '').replace('u_', '')
+                        prefix = "u" if export_sub.startswith('u_') else "r"
+                        with st.status(f"Exporting {target_name} to Parquet...") as status:
+                            try:
+                                _, output = run_captured(export_to_parquet, target_name, prefix=prefix)
+                                status.update(label=f"✅ Exported {target_name} to Parquet!", state="complete")
+                                st.code(output[-500:])
+                            except Exception as e:
+                                status.update(label="❌ Export failed", state="error")
+                                st.error(f"❌ Export failed: {e}")
+                    else:
+                        st.error("Select a target first")
+            
+            # List existing parquet files
+            # Newest 10 without sorting the whole directory (DirEntry caches its stat)
+            parquet_files = heapq.nlargest(
+                10, _dir_entries("data/parquet", ".parquet"), key=lambda e: e.stat().st_mtime
+            )
             if parquet_files:
                 st.write("**Existing Parquet files:**")
-                for f in parquet_files[:10]:
+                for f in parquet_files:
                     size_mb = f.stat().st_size / (1024 * 1024)
                     st.text(f"  • {f.name} ({size_mb:.2f} MB)")
-        
-        st.divider()
-        
-        # Database Maintenance
-        st.subheader("🛠️ Database Maintenance")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("💾 Backup Database"):
-                with st.spinner("Creating backup..."):
-                    import subprocess
-                    result = subprocess.run(
-                        ["python", "main.py", "--backup"],
-                        capture_output=True,
-                        text=True,
-                        cwd=str(Path(__file__).parent.parent)
-                    )
-                    if result.returncode == 0:
-                        st.success("✅ Database backed up!")
-                        st.code(result.stdout[-300:] if len(result.stdout) > 300 else result.stdout)
-                    else:
-                        st.error(f"❌ Backup failed: {result.stderr}")
-        
-        with col2:
-            if st.button("🧹 Vacuum/Optimize"):
-                with st.spinner("Optimizing database..."):
-                    import subprocess
-                    result = subprocess.run(
-                        ["python", "main.py", "--vacuum"],
-                        capture_output=True,
-                        text=True,
-                        cwd=str(Path(__file__).parent.parent)
-                    )
-                    if result.returncode == 0:
-                        st.success("✅ Database optimized!")
-                        st.code(result.stdout[-300:] if len(result.stdout) > 300 else result.stdout)
-                    else:
-                        st.error(f"❌ Vacuum failed: {result.stderr}")
-        
-        with col3:
-            try:
-                from export.database import get_database_info
-                db_info = get_database_info()
-                st.metric("DB Size", f"{db_info.get('size_mb', 0):.2f} MB")
-            except:
-                st.metric("DB Size", "N/A")
-        
-        # Show backup files
-        backup_dir = Path("data/backups")
-        if backup_dir.exists():
-            backups = sorted(backup_dir.glob("*.db"), reverse=True)[:5]
+            
+            # Partitioned exports are dataset directories (name/year_month=YYYY-MM/)
+            parquet_datasets = sorted(e.name for e in _dir_entries("data/parquet", "", dirs=True))
+            if parquet_datasets:
+                st.write("**Partitioned Parquet datasets:**")
+                for name in parquet_datasets:
+                    st.text(f"  • {name}/")
+            
+            st.divider()
+            
+            # Database Maintenance
+            st.subheader("🛠️ Database Maintenance")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                if st.button("💾 Backup Database"):
+                    with st.status("Creating backup...") as status:
+                        try:
+                            _, output = run_captured(backup_database)
+                            status.update(label="✅ Database backed up!", state="complete")
+                            st.code(output[-300:])
+                        except Exception as e:
+                            status.update(label="❌ Backup failed", state="error")
+                            st.error(f"❌ Backup failed: {e}")
+            
+            with col2:
+                if st.button("🧹 Vacuum/Optimize"):
+                    with st.status("Optimizing database...") as status:
+                        try:
+                            _, output = run_captured(vacuum_database)
+                            status.update(label="✅ Database optimized!", state="complete")
+                            st.code(output[-300:])
+                        except Exception as e:
+                            status.update(label="❌ Vacuum failed", state="error")
+                            st.error(f"❌ Vacuum failed: {e}")
+            
+            with col3:
+                try:
+                    db_info = get_database_info()
+                    st.metric("DB Size", f"{db_info.get('size_mb', 0):.2f} MB")
+                except:
+                    st.metric("DB Size", "N/A")
+            
+            # Show backup files
+            # Backup names embed a timestamp, so the largest names are the newest
+            backups = heapq.nlargest(5, _dir_entries("data/backups", ".db"), key=lambda e: e.name)
             if backups:
                 st.write("**Recent Backups:**")
                 for b in backups:
                     size_mb = b.stat().st_size / (1024 * 1024)
                     st.text(f"  • {b.name} ({size_mb:.2f} MB)")
-        
-        st.divider()
-        
-        # Plugin Configuration
-        st.subheader("🔌 Plugins")
-        
-        try:
-            from plugins import load_plugins
-            plugins = load_plugins()
-            
-            if plugins:
-                st.write("**Available Plugins:**")
-                for plugin in plugins:
-                    status = "✅" if plugin.enabled else "❌"
-                    st.markdown(f"{status} **{plugin.name}** - {plugin.description}")
+            
+            st.divider()
+            
+            # Plugin Configuration
+            st.subheader("🔌 Plugins")
+            
+            try:
+                plugins = get_plugins()
                 
-                st.info("💡 Enable plugins when scraping: `python main.py <target> --plugins`")
-            else:
-                st.warning("No plugins found in plugins/ directory")
-        except Exception as e:
-            st.error(f"Plugin loading error: {e}")
-        
-        st.divider()
-        
-        # Quick Commands Reference
-        st.subheader("📋 Quick Commands")
-        st.code("""
-# Start REST API
-python main.py --api
+                if plugins:
+                    st.write("**Available Plugins:**")
+                    for plugin in plugins:
+                        status = "✅" if plugin.enabled else "❌"
+                        st.markdown(f"{status} **{plugin.name}** - {plugin.description}")
+                    
+                    st.info("💡 Enable plugins when scraping: `python main.py <target> --plugins`")
+                else:
+                    st.warning("No plugins found in plugins/ directory")
+            except Exception as e:
+                st.error(f"Plugin loading error: {e}")
+            
+            st.divider()
+            
+            # Quick Commands Reference
+            st.subheader("📋 Quick Commands")
+            st.code("""
+    # Start REST API
+    python main.py --api
 
-# Export to Parquet
-python main.py --export-parquet <subreddit>
+    # Export to Parquet
+    python main.py --export-parquet <subreddit>
 
-# Backup database
-python main.py --backup
+    # Backup database
+    python main.py --backup
 
-# Scrape with plugins
-python main.py <target> --plugins
+    # Scrape with plugins
+    python main.py <target> --plugins
 
-# Dry run (test without saving)
-python main.py <target> --dry-run
-        """, language="bash")
+    # Dry run (test without saving)
+    python main.py <target> --dry-run
+            """, language="bash")
 
 if __name__ == "__main__":
     main()
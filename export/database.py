@@ -4,18 +4,247 @@ Database module - SQLite storage for scraped data
 import sqlite3
 from pathlib import Path
 from datetime import datetime
+import atexit
 import json
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import os
+import threading
+import time
+import uuid
+from functools import wraps
+from operator import itemgetter
 from config import DB_PATH, DATA_DIR
 
-def get_connection():
-    """Get database connection."""
+# Columns that may be requested individually (e.g. API ?fields=)
+POST_COLUMNS = (
+    'id', 'subreddit', 'title', 'author', 'created_utc', 'permalink', 'url',
+    'score', 'upvote_ratio', 'num_comments', 'num_crossposts', 'selftext',
+    'post_type', 'is_nsfw', 'is_spoiler', 'flair', 'total_awards', 'has_media',
+    'media_downloaded', 'source', 'scraped_at', 'sentiment_score', 'sentiment_label'
+)
+COMMENT_COLUMNS = (
+    'id', 'comment_id', 'post_id', 'post_permalink', 'parent_id', 'author', 'body',
+    'score', 'created_utc', 'depth', 'is_submitter', 'scraped_at',
+    'sentiment_score', 'sentiment_label'
+)
+_SELECTABLE_COLUMNS = {'posts': POST_COLUMNS, 'comments': COMMENT_COLUMNS}
+
+# Applied to every connection (these settings don't persist in the file)
+CONNECTION_PRAGMAS = (
+    # Let INSERT OR REPLACE fire delete triggers so rollups stay exact
+    "PRAGMA recursive_triggers = ON",
+    # Safe under WAL: commits skip the fsync, checkpoints still sync
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 134217728",
+    "PRAGMA cache_size = -20000",
+)
+
+# Field -> value used when a scraped record lacks it. The owning subreddit /
+# post id is passed separately and bound as the last column.
+_POST_DEFAULTS = {
+    'id': None, 'title': None, 'author': None, 'created_utc': None, 'permalink': None,
+    'url': None, 'score': 0, 'upvote_ratio': 0, 'num_comments': 0, 'num_crossposts': 0,
+    'selftext': '', 'post_type': None, 'is_nsfw': False, 'is_spoiler': False, 'flair': '',
+    'total_awards': 0, 'has_media': False, 'media_downloaded': False, 'source': ''
+}
+_COMMENT_DEFAULTS = {
+    'comment_id': None, 'post_permalink': None, 'parent_id': None, 'author': None,
+    'body': None, 'score': 0, 'created_utc': None, 'depth': 0, 'is_submitter': False
+}
+_POST_WRITE_COLUMNS = (*_POST_DEFAULTS, 'subreddit')
+_COMMENT_WRITE_COLUMNS = (*_COMMENT_DEFAULTS, 'post_id')
+_post_values = itemgetter(*_POST_DEFAULTS)
+_comment_values = itemgetter(*_COMMENT_DEFAULTS)
+
+def _insert_sql(verb, table, columns):
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+# Writer statements, built once so every call hands sqlite3 the same string
+# and hits its prepared-statement cache
+_REPLACE_POST_SQL = _insert_sql("INSERT OR REPLACE", "posts", _POST_WRITE_COLUMNS)
+_INSERT_POST_SQL = _insert_sql("INSERT OR IGNORE", "posts", _POST_WRITE_COLUMNS)
+_INSERT_COMMENT_SQL = _insert_sql("INSERT OR IGNORE", "comments", _COMMENT_WRITE_COLUMNS)
+_START_JOB_SQL = """
+    INSERT INTO job_history (job_id, target, is_user, mode, status, started_at, dry_run)
+    VALUES (?, ?, ?, ?, 'running', ?, ?)
+"""
+# The duration is computed by SQLite from the stored started_at
+_COMPLETE_JOB_SQL = """
+    UPDATE job_history 
+    SET status = ?, completed_at = ?,
+        duration_seconds = COALESCE((julianday(?) - julianday(started_at)) * 86400.0, 0),
+        posts_scraped = ?, comments_scraped = ?, media_downloaded = ?,
+        errors = ?, error_count = ?
+    WHERE job_id = ?
+    RETURNING duration_seconds
+"""
+
+# Page size for newly created files (vacuum_database() migrates older ones).
+# Bigger pages keep long selftext/comment bodies off overflow-page chains.
+PAGE_SIZE = 16384
+
+# Bump when init_database() gains tables/indexes/triggers so existing files migrate
+SCHEMA_VERSION = 5
+
+# Free pages tolerated before optimize_database() runs incremental_vacuum
+FREELIST_VACUUM_PAGES = 1000
+
+# Seconds that get_database_info()/get_all_subreddits() results stay cached
+INFO_CACHE_TTL = 5
+
+_wal_enabled = False
+_optimize_registered = False
+_schema_ready = False
+_fts_ready = False
+_schema_lock = threading.Lock()
+_local = threading.local()
+# function -> (expires_at, data_version, value); cleared whenever rows are saved
+_info_cache = {}
+
+class ThreadConnection(sqlite3.Connection):
+    """
+    A long-lived per-thread connection.
+    
+    close() only releases it (rolling back anything left uncommitted) so the
+    existing get_connection()/close() call pattern keeps working without
+    reopening the file and re-reading the schema on every call.
+    Use close_connection() to really close it.
+    """
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+def _open_connection():
+    """Open a new connection with WAL and the per-connection PRAGMAs applied."""
+    global _wal_enabled, _optimize_registered
+    
     DATA_DIR.mkdir(exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=ThreadConnection, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    
+    # journal_mode is stored in the database file; set it once per process
+    if not _wal_enabled:
+        # page_size only applies to an empty file and must precede WAL
+        if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            _wal_enabled = True
+        except sqlite3.OperationalError:
+            pass  # Locked by another writer; retried on the next connection
+    
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    
+    # Long-lived processes (API, dashboard) refresh statistics on the way out
+    if not _optimize_registered:
+        atexit.register(_optimize_at_exit)
+        _optimize_registered = True
     return conn
 
+def get_connection():
+    """Get this thread's database connection (opened on first use)."""
+    conn = getattr(_local, 'conn', None)
+    
+    # A connection inherited across fork() (e.g. gunicorn preload) is unsafe to reuse
+    if conn is None or _local.pid != os.getpid():
+        conn = _open_connection()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    elif conn.in_transaction:
+        # Left open by a call that raised before commit/close
+        conn.rollback()
+    
+    if not _schema_ready:
+        _ensure_schema(conn)
+    return conn
+
+def _ensure_schema(conn):
+    """Run init_database() once per process, and only if the file's schema is behind."""
+    global _schema_ready
+    
+    with _schema_lock:
+        if _schema_ready:
+            return
+        # Set first: init_database() calls back into get_connection()
+        _schema_ready = True
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                init_database()
+            _detect_fts(conn)
+        except Exception:
+            _schema_ready = False
+            raise
+
+def _detect_fts(conn):
+    """Use the FTS5 indexes for text search only if this file actually has them."""
+    global _fts_ready
+    
+    row = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('posts_fts', 'comments_fts')"
+    ).fetchone()
+    _fts_ready = row[0] == 2
+
+def _fts_phrase(query):
+    """Quote user text as one FTS5 phrase (trigram phrases match substrings, like LIKE '%q%')."""
+    return '"' + query.replace('"', '""') + '"'
+
+def _use_fts(query):
+    # Trigram indexes can't match terms shorter than 3 characters
+    return _fts_ready and len(query) >= 3
+
+def close_connection():
+    """Really close this thread's connection (it is reopened on next use)."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        if _local.pid == os.getpid():
+            sqlite3.Connection.close(conn)
+
+def data_version():
+    """
+    Cheap fingerprint of the database contents.
+    
+    Any commit touches the WAL file (or the main file after a checkpoint),
+    so their sizes and mtimes change without querying SQLite.
+    """
+    parts = []
+    for path in (DB_PATH, f"{DB_PATH}-wal"):
+        try:
+            st = os.stat(path)
+            parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            parts.append("-")
+    return "|".join(parts)
+
+def _ttl_cached(fn):
+    """
+    Cache a no-argument query function for INFO_CACHE_TTL seconds.
+    
+    Entries are tied to data_version(), so writes from other processes
+    (the scraper while the API runs) invalidate them too.
+    """
+    @wraps(fn)
+    def wrapper():
+        version = data_version()
+        entry = _info_cache.get(fn)
+        if entry and entry[0] > time.monotonic() and entry[1] == version:
+            return entry[2]
+        value = fn()
+        _info_cache[fn] = (time.monotonic() + INFO_CACHE_TTL, version, value)
+        return value
+    return wrapper
+
+def _invalidate_info_cache():
+    _info_cache.clear()
+
+def _optimize_at_exit():
+    try:
+        optimize_database()
+        close_connection()
+    except sqlite3.Error:
+        pass  # Best effort: another process may hold the write lock
+
 def init_database():
     """Initialize database tables."""
     conn = get_connection()
@@ -133,52 +362,223 @@ def init_database():
         )
     """)
     
-    # Create indexes
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_subreddit ON posts(subreddit)")
+    # Daily post counts per subreddit (rollup for Grafana time-series)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_daily'")
+    rollup_exists = cursor.fetchone() is not None
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS posts_daily (
+            subreddit TEXT,
+            day TEXT,
+            count INTEGER DEFAULT 0,
+            PRIMARY KEY (subreddit, day)
+        )
+    """)
+    
+    if not rollup_exists:
+        cursor.execute("""
+            INSERT INTO posts_daily (subreddit, day, count)
+            SELECT subreddit, date(created_utc), COUNT(*)
+            FROM posts WHERE date(created_utc) IS NOT NULL
+            GROUP BY subreddit, date(created_utc)
+        """)
+    
+    # Keep posts_daily in sync with posts
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_posts_daily_insert
+        AFTER INSERT ON posts WHEN date(NEW.created_utc) IS NOT NULL
+        BEGIN
+            INSERT INTO posts_daily (subreddit, day, count)
+            VALUES (NEW.subreddit, date(NEW.created_utc), 1)
+            ON CONFLICT(subreddit, day) DO UPDATE SET count = count + 1;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_posts_daily_delete
+        AFTER DELETE ON posts WHEN date(OLD.created_utc) IS NOT NULL
+        BEGIN
+            UPDATE posts_daily SET count = count - 1
+            WHERE subreddit IS OLD.subreddit AND day = date(OLD.created_utc);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_posts_daily_update
+        AFTER UPDATE OF subreddit, created_utc ON posts
+        BEGIN
+            UPDATE posts_daily SET count = count - 1
+            WHERE subreddit IS OLD.subreddit AND day = date(OLD.created_utc);
+            INSERT INTO posts_daily (subreddit, day, count)
+            SELECT NEW.subreddit, date(NEW.created_utc), 1
+            WHERE date(NEW.created_utc) IS NOT NULL
+            ON CONFLICT(subreddit, day) DO UPDATE SET count = count + 1;
+        END
+    """)
+    
+    # Per-subreddit totals (rollup behind get_subreddit_stats). Sums and
+    # non-NULL counts are kept instead of averages so triggers can add/subtract.
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'subreddit_stats'")
+    stats_exists = cursor.fetchone() is not None
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS subreddit_stats (
+            subreddit TEXT PRIMARY KEY,
+            total_posts INTEGER DEFAULT 0,
+            score_count INTEGER DEFAULT 0,
+            score_sum INTEGER DEFAULT 0,
+            max_score INTEGER,
+            comments_sum INTEGER DEFAULT 0,
+            ratio_count INTEGER DEFAULT 0,
+            ratio_sum REAL DEFAULT 0
+        )
+    """)
+    
+    if not stats_exists:
+        cursor.execute("""
+            INSERT INTO subreddit_stats
+            SELECT subreddit, COUNT(*), COUNT(score), COALESCE(SUM(score), 0), MAX(score),
+                   COALESCE(SUM(num_comments), 0), COUNT(upvote_ratio), COALESCE(SUM(upvote_ratio), 0)
+            FROM posts WHERE subreddit IS NOT NULL
+            GROUP BY subreddit
+        """)
+    
+    # Keep subreddit_stats in sync with posts. MAX can't be un-applied, so a
+    # delete that removes the current max re-reads it from the subreddit's rows.
+    stats_add = """
+            INSERT INTO subreddit_stats (subreddit, total_posts, score_count, score_sum, max_score,
+                                         comments_sum, ratio_count, ratio_sum)
+            SELECT NEW.subreddit, 1, NEW.score IS NOT NULL, COALESCE(NEW.score, 0), NEW.score,
+                   COALESCE(NEW.num_comments, 0), NEW.upvote_ratio IS NOT NULL, COALESCE(NEW.upvote_ratio, 0)
+            WHERE NEW.subreddit IS NOT NULL
+            ON CONFLICT(subreddit) DO UPDATE SET
+                total_posts = total_posts + 1,
+                score_count = score_count + excluded.score_count,
+                score_sum = score_sum + excluded.score_sum,
+                max_score = MAX(COALESCE(max_score, excluded.max_score), COALESCE(excluded.max_score, max_score)),
+                comments_sum = comments_sum + excluded.comments_sum,
+                ratio_count = ratio_count + excluded.ratio_count,
+                ratio_sum = ratio_sum + excluded.ratio_sum;
+    """
+    stats_remove = """
+            UPDATE subreddit_stats SET
+                total_posts = total_posts - 1,
+                score_count = score_count - (OLD.score IS NOT NULL),
+                score_sum = score_sum - COALESCE(OLD.score, 0),
+                max_score = CASE WHEN OLD.score >= max_score
+                                 THEN (SELECT MAX(score) FROM posts WHERE subreddit = OLD.subreddit)
+                                 ELSE max_score END,
+                comments_sum = comments_sum - COALESCE(OLD.num_comments, 0),
+                ratio_count = ratio_count - (OLD.upvote_ratio IS NOT NULL),
+                ratio_sum = ratio_sum - COALESCE(OLD.upvote_ratio, 0)
+            WHERE subreddit = OLD.subreddit;
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_subreddit_stats_insert
+        AFTER INSERT ON posts
+        BEGIN {stats_add} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_subreddit_stats_delete
+        AFTER DELETE ON posts
+        BEGIN {stats_remove} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_subreddit_stats_update
+        AFTER UPDATE OF subreddit, score, num_comments, upvote_ratio ON posts
+        BEGIN {stats_remove} {stats_add} END
+    """)
+    
+    # Full-text indexes over post/comment text, kept in sync by triggers.
+    # The trigram tokenizer (SQLite 3.34+) keeps substring semantics of LIKE '%q%'.
+    try:
+        _create_fts_index(cursor, 'posts', 'posts_fts', ('title', 'selftext'))
+        _create_fts_index(cursor, 'comments', 'comments_fts', ('body',))
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Full-text search unavailable, using LIKE scans: {e}")
+    
+    # Create indexes (composites match the API's filter + sort columns)
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(created_utc)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_score ON posts(score)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_comments_post ON comments(post_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_comments_author ON comments(author)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_sub_created ON posts(subreddit, created_utc DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_author_score ON posts(author, score DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_type_score ON posts(post_type, score DESC)")
+    # Covers a post's thread listing (post_id, score, depth, author, body) so
+    # it is answered from the index without touching the comments table
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_comments_post_covering
+        ON comments(post_id, score DESC, depth, author, body)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_comments_author_score ON comments(author, score DESC)")
+    
+    # Superseded by the composite indexes above
+    cursor.execute("DROP INDEX IF EXISTS idx_posts_subreddit")
+    cursor.execute("DROP INDEX IF EXISTS idx_comments_author")
+    cursor.execute("DROP INDEX IF EXISTS idx_comments_post")
+    cursor.execute("DROP INDEX IF EXISTS idx_comments_post_score")
+    
+    # Refresh planner statistics so new indexes get picked (this only runs
+    # when the schema version changes, not on every start)
+    cursor.execute("ANALYZE")
     
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
     print("✅ Database initialized")
 
+def _create_fts_index(cursor, table, fts, columns):
+    """Create an external-content FTS5 table over table(columns) plus sync triggers."""
+    cursor.execute(f"SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = '{fts}'")
+    fts_exists = cursor.fetchone() is not None
+    
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+        USING fts5({cols}, content='{table}', content_rowid='rowid', tokenize='trigram')
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols});
+        END
+    """)
+    
+    # Index rows that existed before the FTS table
+    if not fts_exists:
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def _row(record, values, defaults, owner):
+    """
+    Bind a scraped record as a parameter tuple.
+    
+    Records that already carry every field go straight through the
+    itemgetter; only incomplete ones pay for merging in the defaults.
+    """
+    try:
+        return (*values(record), owner)
+    except KeyError:
+        return (*values({**defaults, **record}), owner)
+
 def save_post(post_data, subreddit):
     """Save a single post to database."""
     conn = get_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO posts 
-            (id, subreddit, title, author, created_utc, permalink, url, score, 
-             upvote_ratio, num_comments, num_crossposts, selftext, post_type,
-             is_nsfw, is_spoiler, flair, total_awards, has_media, media_downloaded, source)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            post_data.get('id'),
-            subreddit,
-            post_data.get('title'),
-            post_data.get('author'),
-            post_data.get('created_utc'),
-            post_data.get('permalink'),
-            post_data.get('url'),
-            post_data.get('score', 0),
-            post_data.get('upvote_ratio', 0),
-            post_data.get('num_comments', 0),
-            post_data.get('num_crossposts', 0),
-            post_data.get('selftext', ''),
-            post_data.get('post_type'),
-            post_data.get('is_nsfw', False),
-            post_data.get('is_spoiler', False),
-            post_data.get('flair', ''),
-            post_data.get('total_awards', 0),
-            post_data.get('has_media', False),
-            post_data.get('media_downloaded', False),
-            post_data.get('source', '')
-        ))
+        cursor.execute(_REPLACE_POST_SQL, _row(post_data, _post_values, _POST_DEFAULTS, subreddit))
         conn.commit()
+        _invalidate_info_cache()
         return True
     except Exception as e:
         print(f"DB Error: {e}")
@@ -186,95 +586,65 @@ def save_post(post_data, subreddit):
     finally:
         conn.close()
 
-def save_posts_batch(posts, subreddit):
-    """Save multiple posts efficiently."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    saved = 0
+def _insert_many(sql, rows):
+    """
+    Insert rows in one transaction with a single executemany.
     
-    for post in posts:
+    If a row can't be bound (bad value type, constraint error), the batch is
+    rolled back and retried row by row so the good rows still land.
+    Returns the number of rows actually inserted.
+    """
+    conn = get_connection()
+    try:
         try:
-            cursor.execute("""
-                INSERT OR IGNORE INTO posts 
-                (id, subreddit, title, author, created_utc, permalink, url, score, 
-                 upvote_ratio, num_comments, num_crossposts, selftext, post_type,
-                 is_nsfw, is_spoiler, flair, total_awards, has_media, media_downloaded, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                post.get('id'),
-                subreddit,
-                post.get('title'),
-                post.get('author'),
-                post.get('created_utc'),
-                post.get('permalink'),
-                post.get('url'),
-                post.get('score', 0),
-                post.get('upvote_ratio', 0),
-                post.get('num_comments', 0),
-                post.get('num_crossposts', 0),
-                post.get('selftext', ''),
-                post.get('post_type'),
-                post.get('is_nsfw', False),
-                post.get('is_spoiler', False),
-                post.get('flair', ''),
-                post.get('total_awards', 0),
-                post.get('has_media', False),
-                post.get('media_downloaded', False),
-                post.get('source', '')
-            ))
-            if cursor.rowcount > 0:
-                saved += 1
-        except:
-            continue
-    
-    conn.commit()
-    conn.close()
+            saved = conn.executemany(sql, rows).rowcount
+        except sqlite3.Error:
+            conn.rollback()
+            saved = 0
+            for row in rows:
+                try:
+                    saved += conn.execute(sql, row).rowcount
+                except sqlite3.Error:
+                    continue
+        conn.commit()
+    finally:
+        conn.close()
+    if saved:
+        _invalidate_info_cache()
     return saved
 
+def save_posts_batch(posts, subreddit):
+    """Save multiple posts efficiently."""
+    rows = [_row(post, _post_values, _POST_DEFAULTS, subreddit) for post in posts]
+    
+    return _insert_many(_INSERT_POST_SQL, rows)
+
 def save_comments_batch(comments, post_id):
     """Save multiple comments efficiently."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    saved = 0
+    rows = [_row(comment, _comment_values, _COMMENT_DEFAULTS, post_id) for comment in comments]
     
-    for comment in comments:
-        try:
-            cursor.execute("""
-                INSERT OR IGNORE INTO comments 
-                (comment_id, post_id, post_permalink, parent_id, author, body, 
-                 score, created_utc, depth, is_submitter)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                comment.get('comment_id'),
-                post_id,
-                comment.get('post_permalink'),
-                comment.get('parent_id'),
-                comment.get('author'),
-                comment.get('body'),
-                comment.get('score', 0),
-                comment.get('created_utc'),
-                comment.get('depth', 0),
-                comment.get('is_submitter', False)
-            ))
-            if cursor.rowcount > 0:
-                saved += 1
-        except:
-            continue
-    
-    conn.commit()
-    conn.close()
-    return saved
+    return _insert_many(_INSERT_COMMENT_SQL, rows)
 
-def search_posts(query=None, subreddit=None, author=None, min_score=None, 
-                 start_date=None, end_date=None, post_type=None, limit=100):
-    """Search posts with filters."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    sql = "SELECT * FROM posts WHERE 1=1"
+def select_columns(fields=None, table='posts'):
+    """Return a SELECT column list for posts/comments, restricted to known columns."""
+    if not fields:
+        return "*"
+    unknown = [f for f in fields if f not in _SELECTABLE_COLUMNS[table]]
+    if unknown:
+        raise ValueError(f"Unknown {table[:-1]} fields: {', '.join(unknown)}")
+    return ", ".join(fields)
+
+def build_posts_search(query=None, subreddit=None, author=None, min_score=None,
+                       start_date=None, end_date=None, post_type=None, limit=100,
+                       fields=None):
+    """Build the SQL and params for a filtered posts search."""
+    sql = f"SELECT {select_columns(fields)} FROM posts WHERE 1=1"
     params = []
     
-    if query:
+    if query and _use_fts(query):
+        sql += " AND rowid IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?)"
+        params.append(_fts_phrase(query))
+    elif query:
         sql += " AND (title LIKE ? OR selftext LIKE ?)"
         params.extend([f"%{query}%", f"%{query}%"])
     
@@ -305,20 +675,31 @@ def search_posts(query=None, subreddit=None, author=None, min_score=None,
     sql += " ORDER BY created_utc DESC LIMIT ?"
     params.append(limit)
     
-    cursor.execute(sql, params)
-    results = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return results
+    return sql, params
 
-def search_comments(query=None, post_id=None, author=None, min_score=None, limit=100):
-    """Search comments with filters."""
-    conn = get_connection()
-    cursor = conn.cursor()
+def search_posts(query=None, subreddit=None, author=None, min_score=None, 
+                 start_date=None, end_date=None, post_type=None, limit=100,
+                 fields=None):
+    """
+    Search posts with filters (optionally only the given columns).
     
-    sql = "SELECT * FROM comments WHERE 1=1"
+    Yields each row as a dict while the cursor is read, so a caller that
+    stops early never fetches or converts the remaining rows.
+    """
+    sql, params = build_posts_search(query, subreddit, author, min_score,
+                                     start_date, end_date, post_type, limit, fields)
+    yield from _iter_rows(sql, params)
+
+def build_comments_search(query=None, post_id=None, author=None, min_score=None, limit=100,
+                          fields=None):
+    """Build the SQL and params for a filtered comments search."""
+    sql = f"SELECT {select_columns(fields, 'comments')} FROM comments WHERE 1=1"
     params = []
     
-    if query:
+    if query and _use_fts(query):
+        sql += " AND id IN (SELECT rowid FROM comments_fts WHERE comments_fts MATCH ?)"
+        params.append(_fts_phrase(query))
+    elif query:
         sql += " AND body LIKE ?"
         params.append(f"%{query}%")
     
@@ -337,59 +718,86 @@ def search_comments(query=None, post_id=None, author=None, min_score=None, limit
     sql += " ORDER BY score DESC LIMIT ?"
     params.append(limit)
     
-    cursor.execute(sql, params)
-    results = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return results
+    return sql, params
+
+def search_comments(query=None, post_id=None, author=None, min_score=None, limit=100,
+                    fields=None):
+    """Search comments with filters, yielding rows as dicts (see search_posts)."""
+    sql, params = build_comments_search(query, post_id, author, min_score, limit, fields)
+    yield from _iter_rows(sql, params)
+
+def _iter_rows(sql, params):
+    """Run a query on this thread's connection, yielding rows as dicts."""
+    conn = get_connection()
+    cursor = conn.execute(sql, params)
+    try:
+        for row in cursor:
+            yield dict(row)
+    finally:
+        cursor.close()
+        conn.close()
 
 def get_subreddit_stats(subreddit):
     """Get statistics for a subreddit."""
     conn = get_connection()
     cursor = conn.cursor()
     
-    stats = {}
-    
-    # Post stats
+    # Totals come from the trigger-maintained rollup (a single-row lookup)
     cursor.execute("""
         SELECT 
-            COUNT(*) as total_posts,
-            AVG(score) as avg_score,
-            MAX(score) as max_score,
-            SUM(num_comments) as total_comments,
-            AVG(upvote_ratio) as avg_upvote_ratio
-        FROM posts WHERE subreddit = ?
+            total_posts,
+            CASE WHEN score_count THEN score_sum * 1.0 / score_count END as avg_score,
+            max_score,
+            CASE WHEN total_posts THEN comments_sum END as total_comments,
+            CASE WHEN ratio_count THEN ratio_sum / ratio_count END as avg_upvote_ratio
+        FROM subreddit_stats WHERE subreddit = ?
     """, (subreddit,))
     row = cursor.fetchone()
     if row:
-        stats.update(dict(row))
+        stats = dict(row)
+    else:
+        stats = {'total_posts': 0, 'avg_score': None, 'max_score': None,
+                 'total_comments': None, 'avg_upvote_ratio': None}
     
-    # Post type distribution
+    # Post types, top authors and hourly activity in one statement: the CTE is
+    # referenced three times, so SQLite materializes it and reads the
+    # subreddit's rows once. created_utc is ISO-8601 text, so the hour is
+    # sliced out instead of parsing every row with strftime.
     cursor.execute("""
-        SELECT post_type, COUNT(*) as count 
-        FROM posts WHERE subreddit = ? 
-        GROUP BY post_type
+        WITH p AS (
+            SELECT post_type, author, score, created_utc FROM posts WHERE subreddit = ?
+        )
+        SELECT 'type' as kind, post_type as key, COUNT(*) as count, NULL as total_score
+        FROM p GROUP BY post_type
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'author', author, COUNT(*) as post_count, SUM(score)
+            FROM p WHERE author != '[deleted]'
+            GROUP BY author ORDER BY post_count DESC LIMIT 10
+        )
+        UNION ALL
+        SELECT 'hour', substr(created_utc, 12, 2), COUNT(*), NULL
+        FROM p WHERE created_utc GLOB '????-??-??[T ]??*'
+        GROUP BY 2
     """, (subreddit,))
-    stats['post_types'] = {row['post_type']: row['count'] for row in cursor.fetchall()}
     
-    # Top authors
-    cursor.execute("""
-        SELECT author, COUNT(*) as post_count, SUM(score) as total_score
-        FROM posts WHERE subreddit = ? AND author != '[deleted]'
-        GROUP BY author ORDER BY post_count DESC LIMIT 10
-    """, (subreddit,))
-    stats['top_authors'] = [dict(row) for row in cursor.fetchall()]
+    post_types, top_authors, hourly = {}, [], {}
+    for kind, key, count, total_score in cursor.fetchall():
+        if kind == 'type':
+            post_types[key] = count
+        elif kind == 'author':
+            top_authors.append({'author': key, 'post_count': count, 'total_score': total_score})
+        else:
+            hourly[key] = count
     
-    # Activity by hour
-    cursor.execute("""
-        SELECT strftime('%H', created_utc) as hour, COUNT(*) as count
-        FROM posts WHERE subreddit = ?
-        GROUP BY hour ORDER BY hour
-    """, (subreddit,))
-    stats['hourly_activity'] = {row['hour']: row['count'] for row in cursor.fetchall()}
+    stats['post_types'] = post_types
+    stats['top_authors'] = sorted(top_authors, key=lambda a: a['post_count'], reverse=True)
+    stats['hourly_activity'] = dict(sorted(hourly.items()))
     
     conn.close()
     return stats
 
+@_ttl_cached
 def get_all_subreddits():
     """Get list of all scraped subreddits."""
     conn = get_connection()
@@ -415,18 +823,13 @@ def start_job_record(target, mode, is_user=False, dry_run=False):
     Returns:
         job_id: Unique identifier for the job
     """
-    import uuid
-    
     conn = get_connection()
     cursor = conn.cursor()
     
     job_id = str(uuid.uuid4())[:8]
     started_at = datetime.now().isoformat()
     
-    cursor.execute("""
-        INSERT INTO job_history (job_id, target, is_user, mode, status, started_at, dry_run)
-        VALUES (?, ?, ?, ?, 'running', ?, ?)
-    """, (job_id, target, is_user, mode, started_at, dry_run))
+    cursor.execute(_START_JOB_SQL, (job_id, target, is_user, mode, started_at, dry_run))
     
     conn.commit()
     conn.close()
@@ -449,28 +852,15 @@ def complete_job_record(job_id, status, posts=0, comments=0, media=0, errors=Non
     conn = get_connection()
     cursor = conn.cursor()
     
+    # started_at is local time, so the duration is measured against the same
+    # clock (julianday('now') would be UTC)
     completed_at = datetime.now().isoformat()
+    error_count = 1 if errors else 0
     
-    # Calculate duration
-    cursor.execute("SELECT started_at FROM job_history WHERE job_id = ?", (job_id,))
+    cursor.execute(_COMPLETE_JOB_SQL, (status, completed_at, completed_at, posts, comments,
+                                       media, errors, error_count, job_id))
     row = cursor.fetchone()
-    
-    duration = 0
-    error_count = 0
-    if row:
-        started = datetime.fromisoformat(row['started_at'])
-        duration = (datetime.now() - started).total_seconds()
-    
-    if errors:
-        error_count = 1
-    
-    cursor.execute("""
-        UPDATE job_history 
-        SET status = ?, completed_at = ?, duration_seconds = ?,
-            posts_scraped = ?, comments_scraped = ?, media_downloaded = ?,
-            errors = ?, error_count = ?
-        WHERE job_id = ?
-    """, (status, completed_at, duration, posts, comments, media, errors, error_count, job_id))
+    duration = row[0] if row else 0
     
     conn.commit()
     conn.close()
@@ -575,12 +965,37 @@ def enable_auto_vacuum():
     finally:
         conn.close()
 
+def optimize_database():
+    """
+    Cheap routine maintenance: refresh stale planner statistics and trim the
+    free list. Use vacuum_database() for a full rebuild.
+    """
+    conn = get_connection()
+    try:
+        conn.execute("PRAGMA optimize")
+        # incremental_vacuum only works on files created with auto_vacuum=INCREMENTAL
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            if conn.execute("PRAGMA freelist_count").fetchone()[0] > FREELIST_VACUUM_PAGES:
+                # executescript steps it to completion (execute() frees a single page)
+                conn.executescript("PRAGMA incremental_vacuum")
+        conn.commit()
+    finally:
+        conn.close()
+
 def vacuum_database():
     """Run VACUUM to optimize and compact the database."""
     conn = get_connection()
     try:
         print("🔧 Running VACUUM...")
+        if conn.execute("PRAGMA page_size").fetchone()[0] != PAGE_SIZE:
+            # VACUUM can only change the page size outside WAL mode
+            try:
+                conn.execute("PRAGMA journal_mode = DELETE")
+                conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+            except sqlite3.OperationalError:
+                pass  # Other connections are open; keep the old page size
         conn.execute("VACUUM")
+        conn.execute("PRAGMA journal_mode = WAL")
         print("✅ Database optimized")
     finally:
         conn.close()
@@ -595,8 +1010,6 @@ def backup_database(backup_path=None):
     Returns:
         Path to the backup file
     """
-    import shutil
-    
     backup_dir = DATA_DIR / "backups"
     backup_dir.mkdir(exist_ok=True)
     
@@ -604,7 +1017,15 @@ def backup_database(backup_path=None):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = backup_dir / f"reddit_scraper_{timestamp}.db"
     
-    shutil.copy2(DB_PATH, backup_path)
+    # SQLite's online backup copies pages under a read lock, so the snapshot
+    # stays consistent even while the scraper is writing (a file copy doesn't)
+    src = get_connection()
+    dst = sqlite3.connect(backup_path)
+    try:
+        src.backup(dst, pages=-1)
+    finally:
+        dst.close()
+        src.close()
     
     # Get file size
     size_mb = Path(backup_path).stat().st_size / (1024 * 1024)
@@ -612,31 +1033,29 @@ def backup_database(backup_path=None):
     
     return str(backup_path)
 
+@_ttl_cached
 def get_database_info():
     """Get database size and table info."""
     info = {}
     
-    # File size
-    if DB_PATH.exists():
-        info['size_mb'] = DB_PATH.stat().st_size / (1024 * 1024)
+    # File size (one stat call instead of exists() + stat())
+    try:
+        info['size_mb'] = os.stat(DB_PATH).st_size / (1024 * 1024)
+    except FileNotFoundError:
+        pass
     
     conn = get_connection()
     cursor = conn.cursor()
     
-    # Table counts
+    # Table counts, all in one statement
     tables = ['posts', 'comments', 'job_history', 'alerts', 'subreddits']
-    info['tables'] = {}
+    counts = ", ".join(f"(SELECT COUNT(*) FROM {table})" for table in tables)
     
-    for table in tables:
-        try:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            info['tables'][table] = cursor.fetchone()[0]
-        except:
-            info['tables'][table] = 0
+    try:
+        cursor.execute(f"SELECT {counts}")
+        info['tables'] = dict(zip(tables, cursor.fetchone()))
+    except sqlite3.Error:
+        info['tables'] = dict.fromkeys(tables, 0)
     
     conn.close()
     return info
-
-# Initialize on import
-init_database()
-
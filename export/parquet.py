@@ -2,11 +2,536 @@
 Parquet Export Module - For DuckDB/Warehouse integration
 Export scraped data to Parquet format for analytics tools.
 """
+import os
+import time
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
 from pathlib import Path
 from datetime import datetime
 
-def export_to_parquet(subreddit, output_dir=None, prefix="r"):
+# Column types applied while parsing, so no pandas fixup pass is needed
+POST_INT_COLUMNS = ('score', 'num_comments', 'num_crossposts', 'total_awards')
+POST_BOOL_COLUMNS = ('is_nsfw', 'is_spoiler', 'has_media', 'media_downloaded')
+COMMENT_INT_COLUMNS = ('score',)
+# Every column the scraper writes, so Arrow's parser never has to infer a type
+POST_CSV_COLUMNS = {
+    'id': 'string', 'title': 'string', 'author': 'dictionary', 'created_utc': 'timestamp',
+    'permalink': 'string', 'url': 'string', 'score': 'int32', 'upvote_ratio': 'float64',
+    'num_comments': 'int32', 'num_crossposts': 'int32', 'selftext': 'string',
+    'post_type': 'dictionary', 'is_nsfw': 'bool', 'is_spoiler': 'bool', 'flair': 'dictionary',
+    'total_awards': 'int32', 'has_media': 'bool', 'media_downloaded': 'bool', 'source': 'dictionary',
+}
+COMMENT_CSV_COLUMNS = {
+    'post_permalink': 'string', 'comment_id': 'string', 'parent_id': 'string',
+    'author': 'dictionary', 'body': 'string', 'score': 'int32', 'created_utc': 'timestamp',
+    'depth': 'int32', 'is_submitter': 'bool',
+}
+# Tokens the scraper writes for a true flag (anything else, incl. blank, is False)
+BOOL_TRUE_VALUES = np.array([True, 'True', 'true', '1', 1], dtype=object)
+
+DEFAULT_OUTPUT_DIR = Path("data/parquet")
+
+# ZSTD is close to Snappy's speed on Reddit text but writes much smaller files
+DEFAULT_COMPRESSION = "zstd"
+COMPRESSION_LEVEL = 3
+# Low-cardinality columns are parsed straight into Arrow dictionary arrays and
+# written with dictionary + RLE encoding; free text stays plain
+DICTIONARY_COLUMNS = ['subreddit', 'author', 'flair', 'post_type', 'source', 'sentiment_label']
+
+# Large pages/batches and a buffered sink turn a write into a few big I/Os,
+# which matters when output_dir is a network mount (NFS, s3fs)
+DATA_PAGE_SIZE = 1 << 20
+WRITE_BATCH_SIZE = 8192
+WRITE_BUFFER_SIZE = 4 << 20
+
+# Monotonic-ish integer columns stored as DELTA_BINARY_PACKED, which decodes
+# faster than the default RLE/plain
+DELTA_COLUMNS = ('score', 'num_comments', 'created_utc')
+
+# Scraped posts/comments are written as Hive-partitioned datasets
+# (subreddit_posts/year_month=2024-01/...) so date filters skip whole months
+PARTITION_BY = ('year_month',)
+# Partition columns derived from created_utc
+PARTITION_FORMATS = {'year_month': '%Y-%m', 'date': '%Y-%m-%d'}
+
+# Rows are clustered on these keys before writing so each row group's
+# min/max footer statistics cover a tight range and
+# "WHERE created_utc BETWEEN ..." skips whole groups
+SORT_KEYS = (('created_utc', 'ascending'),)
+ROW_GROUP_ROWS = 128_000
+
+# Rows per row group when exporting database tables
+DB_EXPORT_CHUNK_ROWS = 100_000
+# Below this many rows the GPU transfer costs more than it saves
+GPU_MIN_ROWS = 100_000
+# ORDER BY for database exports (posts span every subreddit)
+DB_EXPORT_ORDER = {
+    'posts': 'subreddit, created_utc',
+    'comments': 'created_utc',
+}
+
+def _coerce_int32(values):
+    """Numbers in a mixed column as int32, 0 where unparseable, in one output buffer."""
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    out = np.zeros(len(numbers), dtype=np.int32)
+    valid = ~np.isnan(numbers)
+    out[valid] = numbers[valid]
+    return out
+
+def _read_csv_pandas(csv_path, int_columns, bool_columns):
+    """Forgiving pandas parse (mixed timestamp formats, ragged rows)."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    # Nullable dtypes: missing counts are filled with 0 on the Arrow side
+    dtype = {col: 'Int32' for col in int_columns if col in header}
+    dtype.update({col: 'boolean' for col in bool_columns if col in header})
+    
+    try:
+        # Typed by the C parser in one pass
+        df = pd.read_csv(csv_path, dtype=dtype, engine='c',
+                         parse_dates=['created_utc'] if 'created_utc' in header else False)
+    except (ValueError, TypeError):
+        # A value that doesn't fit its column's type; coerce column by column
+        df = pd.read_csv(csv_path)
+        for col in int_columns:
+            if col in df.columns:
+                df[col] = _coerce_int32(df[col])
+        for col in bool_columns:
+            if col in df.columns:
+                # astype(bool) would turn blanks (NaN) into True
+                df[col] = np.isin(df[col].to_numpy(dtype=object), BOOL_TRUE_VALUES)
+    
+    # parse_dates leaves mixed-offset timestamps as text
+    if 'created_utc' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['created_utc']):
+        df['created_utc'] = pd.to_datetime(df['created_utc'], errors='coerce')
+    
+    return df
+
+def _table_from_pandas(df):
+    """
+    Build an Arrow table column by column from a dtype-normalized DataFrame.
+    
+    Numeric/bool columns convert from their NumPy buffers directly, so this skips the
+    generic pa.Table.from_pandas converter and its pandas metadata.
+    Types match the streaming reader: timestamp('us'), dictionary-encoded
+    DICTIONARY_COLUMNS, plain strings.
+    """
+    import pyarrow as pa
+    
+    arrays = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            tz = getattr(values.dt, 'tz', None)
+            arr = pa.Array.from_pandas(values, type=pa.timestamp('us', tz=str(tz) if tz else None))
+        elif values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            arr = pa.array(values, type=pa.string(), from_pandas=True)
+        elif isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+            # Nullable Int32/boolean convert straight from their data + mask
+            arr = pa.array(values.array)
+        else:
+            arr = pa.Array.from_pandas(values.to_numpy())
+        if col in DICTIONARY_COLUMNS:
+            arr = arr.dictionary_encode()
+        arrays.append(arr)
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+def _writer_options(compression, schema):
+    """Keyword arguments for ParquetWriter / dataset write options."""
+    import pyarrow as pa
+    
+    options = {
+        'compression': compression,
+        'use_dictionary': DICTIONARY_COLUMNS,
+        'data_page_size': DATA_PAGE_SIZE,
+        'write_batch_size': WRITE_BATCH_SIZE,
+        # v2 pages plus column/offset indexes let readers skip individual pages
+        'version': '2.6',
+        'data_page_version': '2.0',
+        'write_statistics': True,
+        'write_page_index': True,
+        # Only integer/timestamp columns can be delta-encoded (the database
+        # stores created_utc as text)
+        'column_encoding': {
+            field.name: 'DELTA_BINARY_PACKED'
+            for field in schema
+            if field.name in DELTA_COLUMNS
+            and (pa.types.is_integer(field.type) or pa.types.is_timestamp(field.type))
+        },
+    }
+    # Snappy/LZ4 have no levels and reject the argument
+    if compression in ('zstd', 'gzip', 'brotli'):
+        options['compression_level'] = COMPRESSION_LEVEL
+    return options
+
+def _open_writer(output_file, schema, compression):
+    """
+    A ParquetWriter over a WRITE_BUFFER_SIZE buffered file stream.
+    
+    Returns (writer, sink); close the writer first, then the sink.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    sink = pa.output_stream(str(output_file), buffer_size=WRITE_BUFFER_SIZE)
+    try:
+        return pq.ParquetWriter(sink, schema, **_writer_options(compression, schema)), sink
+    except Exception:
+        sink.close()
+        raise
+
+def _add_partition_columns(table, partition_by):
+    """Append the derived partition columns (PARTITION_FORMATS of created_utc)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    for col in partition_by or ():
+        if col not in PARTITION_FORMATS or col in table.column_names:
+            continue
+        if 'created_utc' in table.column_names:
+            values = pc.strftime(table['created_utc'], format=PARTITION_FORMATS[col])
+        else:
+            values = pa.nulls(table.num_rows, pa.string())
+        table = table.append_column(col, values)
+    return table
+
+def _write_parquet(tables, schema, output, compression, partition_by):
+    """
+    Write an iterable of tables to one Parquet file, or to a Hive-partitioned
+    directory (output/year_month=2024-01/part-0.parquet) when partition_by is set.
+    Row groups hold at most ROW_GROUP_ROWS rows. A dataset also gets a
+    _metadata sidecar with every file's footer, so readers can plan from
+    one file instead of opening each part.
+    """
+    if not partition_by:
+        writer, sink = _open_writer(output, schema, compression)
+        with sink, writer:
+            for table in tables:
+                writer.write_table(table, row_group_size=ROW_GROUP_ROWS)
+        return
+    
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    
+    footers = []
+    
+    def collect_footer(written_file):
+        metadata = written_file.metadata
+        metadata.set_file_path(Path(written_file.path).relative_to(output).as_posix())
+        footers.append(metadata)
+    
+    file_options = ds.ParquetFileFormat().make_write_options(**_writer_options(compression, schema))
+    ds.write_dataset(
+        (batch for table in tables for batch in table.to_batches()),
+        output,
+        schema=schema,
+        format='parquet',
+        partitioning=list(partition_by),
+        partitioning_flavor='hive',
+        file_options=file_options,
+        max_rows_per_group=ROW_GROUP_ROWS,
+        # Re-exports replace the months they cover
+        existing_data_behavior='delete_matching',
+        file_visitor=collect_footer,
+    )
+    
+    # Partition values live in the directory names, not in the files
+    file_schema = schema
+    for col in partition_by:
+        file_schema = file_schema.remove(file_schema.get_field_index(col))
+    pq.write_metadata(file_schema, Path(output) / "_common_metadata")
+    pq.write_metadata(file_schema, Path(output) / "_metadata", metadata_collector=footers)
+
+def _prepare(table, int_columns=(), sort_keys=(), partition_by=()):
+    """Fill missing counts, cluster on sort_keys and add the partition columns."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    # Missing counts were always exported as 0
+    for col in int_columns:
+        if col in table.column_names:
+            i = table.schema.get_field_index(col)
+            values = table[col]
+            if pa.types.is_null(values.type):
+                # All-None column from in-memory records
+                values = values.cast(pa.int32())
+            table = table.set_column(i, col, pc.fill_null(values, 0))
+    keys = [(col, order) for col, order in sort_keys or () if col in table.column_names]
+    if keys:
+        table = table.sort_by(keys)
+    return _add_partition_columns(table, partition_by)
+
+def _write_table_to_parquet(table, output, int_columns=(), compression=DEFAULT_COMPRESSION,
+                            partition_by=(), sort_keys=()):
+    """Write an in-memory Arrow table (file or dataset directory); returns the row count."""
+    table = _prepare(table, int_columns, sort_keys, partition_by)
+    _write_parquet([table], table.schema, output, compression, partition_by)
+    return table.num_rows
+
+def _column_types(csv_columns):
+    """Arrow types for a column spec such as POST_CSV_COLUMNS (name -> type name)."""
+    import pyarrow as pa
+    
+    types = {
+        'string': pa.string(),
+        'float64': pa.float64(),
+        'int32': pa.int32(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('us'),
+        'dictionary': pa.dictionary(pa.int32(), pa.string()),
+    }
+    return {col: types[name] for col, name in (csv_columns or {}).items()}
+
+def _as_arrow(data, csv_columns=None):
+    """
+    An Arrow table from a pa.Table, a DataFrame or an iterable of record dicts,
+    with the same created_utc / dictionary column types the CSV reader produces.
+    Columns in csv_columns are cast to their spec type.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    if isinstance(data, pd.DataFrame):
+        table = _table_from_pandas(data)
+    elif isinstance(data, pa.Table):
+        table = data
+    else:
+        table = pa.Table.from_pylist(list(data))
+    
+    if 'created_utc' in table.column_names and pa.types.is_string(table.schema.field('created_utc').type):
+        i = table.schema.get_field_index('created_utc')
+        try:
+            created = pc.cast(table['created_utc'], pa.timestamp('us'))
+        except pa.ArrowInvalid:
+            # Mixed formats/offsets; same coercion as the pandas CSV fallback
+            created = pa.array(pd.to_datetime(table['created_utc'].to_pandas(), errors='coerce'))
+        table = table.set_column(i, 'created_utc', created)
+    
+    for col in DICTIONARY_COLUMNS:
+        if col in table.column_names and pa.types.is_string(table.schema.field(col).type):
+            i = table.schema.get_field_index(col)
+            table = table.set_column(i, col, pc.dictionary_encode(table[col]))
+    
+    for col, type_ in _column_types(csv_columns).items():
+        if col in table.column_names and table.schema.field(col).type != type_:
+            i = table.schema.get_field_index(col)
+            table = table.set_column(i, col, table[col].cast(type_))
+    return table
+
+def _csv_to_parquet(csv_path, output, int_columns=(), bool_columns=(),
+                    compression=DEFAULT_COMPRESSION, partition_by=(), sort_keys=(), csv_columns=None):
+    """
+    Convert a scraped CSV to Parquet with PyArrow's multithreaded CSV reader.
+    
+    Types are set while parsing. With sort_keys the whole file is read and
+    sorted at once, so row groups cover disjoint created_utc ranges and
+    readers can prune on their statistics; without them each parsed block
+    is written on its own and peak memory is one block. csv_columns (name -> type name, e.g. POST_CSV_COLUMNS) types
+    every known column up front. With partition_by, output is a dataset
+    directory instead of a file. Returns the number of rows.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    
+    column_types = _column_types(csv_columns)
+    column_types['created_utc'] = pa.timestamp('us')
+    column_types.update({col: pa.int32() for col in int_columns})
+    column_types.update({col: pa.bool_() for col in bool_columns})
+    column_types.update({col: pa.dictionary(pa.int32(), pa.string()) for col in DICTIONARY_COLUMNS})
+    
+    def prepare(table):
+        return _prepare(table, int_columns, sort_keys, partition_by)
+    
+    rows = 0
+    
+    def blocks(reader):
+        nonlocal rows
+        for batch in reader:
+            rows += batch.num_rows
+            yield prepare(pa.Table.from_batches([batch]))
+    
+    try:
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(block_size=16 << 20, use_threads=True),
+            # selftext/body are quoted multi-line fields
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                column_types=column_types,
+                null_values=['', 'NA'],
+                strings_can_be_null=True,
+            ),
+        )
+        if any(col in reader.schema.names for col, _ in sort_keys or ()):
+            # Sorting block by block would leave row groups overlapping
+            table = prepare(reader.read_all())
+            _write_parquet([table], table.schema, output, compression, partition_by)
+            return table.num_rows
+        schema = prepare(reader.schema.empty_table()).schema
+        _write_parquet(blocks(reader), schema, output, compression, partition_by)
+        return rows
+    except pa.ArrowInvalid:
+        # e.g. RSS timestamps with a zone offset next to naive ones, or a
+        # column whose type inferred from the first block doesn't fit later ones
+        df = _read_csv_pandas(csv_path, int_columns, bool_columns)
+        return _write_table_to_parquet(_table_from_pandas(df), output, int_columns,
+                                       compression, partition_by, sort_keys)
+
+def _output_size(path):
+    """Size in bytes of a Parquet file or of every file in a dataset directory."""
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*.parquet"))
+    return path.stat().st_size
+
+def _arrow_type(pa, name, declared):
+    """Arrow type for a SQLite column, from its declared type (SQLite's affinity rules)."""
+    if name in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    declared = (declared or '').upper()
+    if 'INT' in declared or 'BOOL' in declared:
+        return pa.int64()
+    if 'REAL' in declared or 'FLOA' in declared or 'DOUB' in declared:
+        return pa.float64()
+    return pa.string()
+
+def _select_all(table, source=""):
+    """SELECT for a table export, clustered on DB_EXPORT_ORDER when set."""
+    sql = f"SELECT * FROM {source}{table}"
+    if table in DB_EXPORT_ORDER:
+        sql += f" ORDER BY {DB_EXPORT_ORDER[table]}"
+    return sql
+
+def _table_chunks(conn, table):
+    """
+    A database table as (schema, iterator of Arrow tables of up to
+    DB_EXPORT_CHUNK_ROWS rows each).
+    
+    The schema comes from the declared column types, so every chunk gets the
+    same types even when a column is entirely NULL within one chunk.
+    """
+    import pyarrow as pa
+    
+    schema = pa.schema([
+        (col['name'], _arrow_type(pa, col['name'], col['type']))
+        for col in conn.execute(f"PRAGMA table_info({table})")
+    ])
+    
+    cursor = conn.cursor()
+    cursor.row_factory = None  # plain tuples
+    cursor.execute(_select_all(table))
+    
+    def chunks():
+        while True:
+            rows = cursor.fetchmany(DB_EXPORT_CHUNK_ROWS)
+            if not rows:
+                return
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            yield pa.Table.from_arrays(arrays, schema=schema)
+    
+    return schema, chunks()
+
+def _table_to_parquet(conn, table, output_file, compression=DEFAULT_COMPRESSION):
+    """
+    Stream a database table into Parquet DB_EXPORT_CHUNK_ROWS rows at a time.
+    
+    Returns the number of rows (no file is written for an empty table).
+    """
+    schema, chunks = _table_chunks(conn, table)
+    first = next(chunks, None)
+    if first is None:
+        return 0
+    
+    total = 0
+    writer, sink = _open_writer(output_file, schema, compression)
+    with sink, writer:
+        for chunk in chain([first], chunks):
+            writer.write_table(chunk)
+            total += chunk.num_rows
+    return total
+
+def _cudf_write(conn, table, output_file, compression=DEFAULT_COMPRESSION):
+    """
+    Write a database table with cuDF's GPU Parquet writer.
+    
+    Returns the row count, or None to use the CPU writers: cudf (optional)
+    missing, fewer than GPU_MIN_ROWS rows, or a CUDA error.
+    """
+    try:
+        import cudf
+    except ImportError:
+        return None
+    
+    rows = conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    if rows < GPU_MIN_ROWS:
+        return None
+    
+    try:
+        import pyarrow as pa
+        
+        _, chunks = _table_chunks(conn, table)
+        gdf = cudf.DataFrame.from_arrow(pa.concat_tables(list(chunks)))
+        gdf.to_parquet(
+            str(output_file),
+            compression={'zstd': 'ZSTD', 'lz4': 'LZ4'}.get(compression, compression),
+            row_group_size_rows=ROW_GROUP_ROWS,
+        )
+        return rows
+    except Exception as e:
+        # CUDA/driver failures surface as assorted exception types
+        print(f"   ⚠️ GPU export of {table} failed, using CPU: {e}")
+        return None
+
+def _duckdb_source(db_path):
+    """
+    A DuckDB connection with the SQLite database attached read-only as "src".
+    
+    Returns None when duckdb (optional) or its sqlite extension is unavailable.
+    """
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    
+    try:
+        con = duckdb.connect()
+        con.execute("INSTALL sqlite")
+        con.execute("LOAD sqlite")
+        path = str(db_path).replace("'", "''")
+        con.execute(f"ATTACH '{path}' AS src (TYPE SQLITE, READ_ONLY)")
+        return con
+    except duckdb.Error as e:
+        print(f"   ⚠️ DuckDB sqlite scanner unavailable, using PyArrow: {e}")
+        return None
+
+def _duckdb_copy(con, table, output_file, compression=DEFAULT_COMPRESSION):
+    """
+    COPY a table to Parquet with DuckDB's native multithreaded writer.
+    
+    Returns the row count (no file for an empty table), or None if DuckDB
+    couldn't read the table (e.g. values that don't match the declared type).
+    """
+    import duckdb
+    
+    try:
+        rows = con.execute(f"SELECT count(*) FROM src.{table}").fetchone()[0]
+        if rows == 0:
+            return 0
+        
+        options = f"FORMAT PARQUET, COMPRESSION {compression.upper()}, ROW_GROUP_SIZE {DB_EXPORT_CHUNK_ROWS}"
+        if compression == 'zstd':
+            options += f", COMPRESSION_LEVEL {COMPRESSION_LEVEL}"
+        path = str(output_file).replace("'", "''")
+        con.execute(f"COPY ({_select_all(table, 'src.')}) TO '{path}' ({options})")
+        return rows
+    except duckdb.Error as e:
+        print(f"   ⚠️ DuckDB export of {table} failed, using PyArrow: {e}")
+        return None
+
+def export_to_parquet(subreddit, output_dir=None, prefix="r", compression=DEFAULT_COMPRESSION,
+                      partition_by=PARTITION_BY, sort_keys=SORT_KEYS, posts=None, comments=None,
+                      timestamp=None):
     """
     Export subreddit data to Parquet format.
     
@@ -14,9 +539,18 @@ def export_to_parquet(subreddit, output_dir=None, prefix="r"):
         subreddit: Subreddit name
         output_dir: Output directory (default: data/parquet)
         prefix: "r" for subreddit, "u" for user
+        compression: Parquet codec ("zstd", "snappy", "gzip", ...)
+        partition_by: Hive partition columns (default: year_month, derived
+            from created_utc); pass None/[] for one flat file per table
+        sort_keys: (column, "ascending"/"descending") pairs rows are clustered
+            on before writing; pass None to keep CSV order
+        posts, comments: Rows already in memory (pa.Table, DataFrame or list
+            of dicts), written instead of re-reading the scraped CSV
+        timestamp: YYYYMMDD suffix for flat files (default: today), so a
+            batch of exports can share one
     
     Returns:
-        Dictionary with paths to exported files
+        Dictionary with paths to exported files (or dataset directories)
     """
     try:
         import pyarrow
@@ -25,73 +559,155 @@ def export_to_parquet(subreddit, output_dir=None, prefix="r"):
     
     # Setup paths
     data_dir = Path(f"data/{prefix}_{subreddit}")
-    output_path = Path(output_dir) if output_dir else Path("data/parquet")
+    output_path = Path(output_dir) if output_dir else DEFAULT_OUTPUT_DIR
     output_path.mkdir(parents=True, exist_ok=True)
     
-    if not data_dir.exists():
+    if posts is None and comments is None and not data_dir.exists():
         print(f"❌ No data found for {prefix}/{subreddit}")
         return {}
     
     exported = {}
-    timestamp = datetime.now().strftime("%Y%m%d")
+    if not partition_by and timestamp is None:
+        timestamp = datetime.now().strftime("%Y%m%d")
     
-    # Export posts
-    posts_csv = data_dir / "posts.csv"
-    if posts_csv.exists():
-        print(f"📦 Converting posts to Parquet...")
-        df = pd.read_csv(posts_csv)
-        
-        # Convert datetime columns
-        if 'created_utc' in df.columns:
-            df['created_utc'] = pd.to_datetime(df['created_utc'], errors='coerce')
-        
-        # Optimize dtypes
-        for col in ['score', 'num_comments', 'num_crossposts', 'total_awards']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
-        
-        for col in ['is_nsfw', 'is_spoiler', 'has_media', 'media_downloaded']:
-            if col in df.columns:
-                df[col] = df[col].astype(bool)
-        
-        output_file = output_path / f"{subreddit}_posts_{timestamp}.parquet"
-        df.to_parquet(output_file, engine="pyarrow", compression="snappy")
-        
-        size_mb = output_file.stat().st_size / (1024 * 1024)
-        print(f"   ✅ {output_file.name} ({len(df)} rows, {size_mb:.2f} MB)")
-        exported['posts'] = str(output_file)
-    
-    # Export comments
-    comments_csv = data_dir / "comments.csv"
-    if comments_csv.exists():
-        print(f"📦 Converting comments to Parquet...")
-        df = pd.read_csv(comments_csv)
-        
-        if 'created_utc' in df.columns:
-            df['created_utc'] = pd.to_datetime(df['created_utc'], errors='coerce')
-        
-        if 'score' in df.columns:
-            df['score'] = pd.to_numeric(df['score'], errors='coerce').fillna(0).astype('int32')
-        
-        output_file = output_path / f"{subreddit}_comments_{timestamp}.parquet"
-        df.to_parquet(output_file, engine="pyarrow", compression="snappy")
+    sources = (
+        ('posts', posts, POST_CSV_COLUMNS, POST_INT_COLUMNS, POST_BOOL_COLUMNS),
+        ('comments', comments, COMMENT_CSV_COLUMNS, COMMENT_INT_COLUMNS, ()),
+    )
+    
+    def convert(data, csv_path, output_file, csv_columns, int_columns, bool_columns):
+        if data is not None:
+            return _write_table_to_parquet(_as_arrow(data), output_file, int_columns,
+                                           compression, partition_by, sort_keys)
+        return _csv_to_parquet(csv_path, output_file, int_columns, bool_columns,
+                               compression, partition_by, sort_keys, csv_columns)
+    
+    # Posts and comments convert concurrently: Arrow's CSV parsing, encoding
+    # and compression run without the GIL
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = {}
+        for kind, data, csv_columns, int_columns, bool_columns in sources:
+            csv_path = data_dir / f"{kind}.csv"
+            if data is None and not csv_path.exists():
+                continue
+            if partition_by:
+                output_file = output_path / f"{subreddit}_{kind}"
+            else:
+                output_file = output_path / f"{subreddit}_{kind}_{timestamp}.parquet"
+            print(f"📦 Converting {kind} to Parquet...")
+            futures[kind] = (output_file, pool.submit(convert, data, csv_path, output_file,
+                                                      csv_columns, int_columns, bool_columns))
         
-        size_mb = output_file.stat().st_size / (1024 * 1024)
-        print(f"   ✅ {output_file.name} ({len(df)} rows, {size_mb:.2f} MB)")
-        exported['comments'] = str(output_file)
+        for kind, (output_file, future) in futures.items():
+            rows = future.result()
+            size_mb = _output_size(output_file) / (1024 * 1024)
+            print(f"   ✅ {output_file.name} ({rows} rows, {size_mb:.2f} MB)")
+            exported[kind] = str(output_file)
     
     print(f"\n✅ Export complete! Files saved to: {output_path}")
-    print(f"   💡 Query with DuckDB: duckdb.query(\"SELECT * FROM '{exported.get('posts', '')}' LIMIT 10\")")
+    if partition_by and 'posts' in exported:
+        print(f"   💡 Query with DuckDB: duckdb.query(\"SELECT * FROM read_parquet('{exported['posts']}/**/*.parquet', hive_partitioning=1) LIMIT 10\")")
+    else:
+        print(f"   💡 Query with DuckDB: duckdb.query(\"SELECT * FROM '{exported.get('posts', '')}' LIMIT 10\")")
     
     return exported
 
+def export_table_to_parquet(data, output_file, compression=DEFAULT_COMPRESSION,
+                            partition_by=None, sort_keys=SORT_KEYS,
+                            int_columns=POST_INT_COLUMNS):
+    """
+    Write rows the caller already holds straight to Parquet (no CSV round-trip).
+    
+    Args:
+        data: pa.Table, DataFrame or iterable of post/comment dicts
+        output_file: Parquet file, or dataset directory when partition_by is set
+        compression: Parquet codec ("zstd", "snappy", "gzip", ...)
+        partition_by: Hive partition columns, e.g. ['year_month']
+        sort_keys: (column, "ascending"/"descending") pairs to cluster on
+        int_columns: Integer columns to null-fill (COMMENT_INT_COLUMNS for comments)
+    
+    Returns:
+        Number of rows written
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    return _write_table_to_parquet(_as_arrow(data), output_file, int_columns,
+                                   compression, partition_by, sort_keys)
+
+def append_to_dataset(rows, dataset_dir, csv_columns=None, int_columns=(),
+                      partition_by=('date',), compression=DEFAULT_COMPRESSION):
+    """
+    Append scraped rows to a Hive-partitioned Parquet dataset (the scraper's
+    Parquet storage: dataset_dir/date=2024-01-31/part-<id>-0.parquet).
+    
+    Every call adds new part files and leaves existing ones alone; csv_columns
+    (POST_CSV_COLUMNS / COMMENT_CSV_COLUMNS) pins the column types so all
+    parts share one schema. Returns the number of rows written.
+    """
+    import uuid
+    import pyarrow.dataset as ds
+    
+    rows = list(rows)
+    if not rows:
+        return 0
+    
+    table = _prepare(_as_arrow(rows, csv_columns), int_columns, (), partition_by)
+    file_options = ds.ParquetFileFormat().make_write_options(**_writer_options(compression, table.schema))
+    ds.write_dataset(
+        table,
+        dataset_dir,
+        format='parquet',
+        partitioning=list(partition_by),
+        partitioning_flavor='hive',
+        file_options=file_options,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return table.num_rows
+
+def read_dataset_column(dataset_dir, column):
+    """One column of a Parquet dataset as a Python list ([] if it doesn't exist)."""
+    import pyarrow.dataset as ds
+    
+    if not Path(dataset_dir).is_dir():
+        return []
+    dataset = ds.dataset(dataset_dir, format='parquet', partitioning='hive')
+    return dataset.to_table(columns=[column])[column].to_pylist()
+
+def _export_table(table, output_file, compression, duck=None, gpu=False):
+    """
+    Export one database table on a worker thread; returns (output_file, rows).
+    
+    Each worker uses its own DuckDB cursor / SQLite connection, as neither
+    is safe to share between threads.
+    """
+    from export.database import get_connection, close_connection
+    
+    rows = None
+    try:
+        if gpu:
+            rows = _cudf_write(get_connection(), table, output_file, compression)
+        if rows is None and duck is not None:
+            cursor = duck.cursor()
+            try:
+                rows = _duckdb_copy(cursor, table, output_file, compression)
+            finally:
+                cursor.close()
+        if rows is None:
+            rows = _table_to_parquet(get_connection(), table, output_file, compression)
+    finally:
+        # Pool threads exit after the export; don't leave their connections to GC
+        close_connection()
+    return output_file, rows
 
-def export_database_to_parquet(output_dir=None):
+def export_database_to_parquet(output_dir=None, compression=DEFAULT_COMPRESSION, timestamp=None):
     """
     Export entire SQLite database to Parquet files.
     
     Args:
         output_dir: Output directory
+        compression: Parquet codec ("zstd", "snappy", "gzip", ...)
+        timestamp: YYYYMMDD file name suffix (default: today)
     
     Returns:
         Dictionary with paths to exported files
@@ -101,61 +717,77 @@ def export_database_to_parquet(output_dir=None):
     except ImportError:
         raise ImportError("pyarrow required. Run: pip install pyarrow")
     
-    from export.database import get_connection
+    from config import EXPORT_USE_GPU
+    from export.database import get_connection, DB_PATH
     
-    output_path = Path(output_dir) if output_dir else Path("data/parquet")
+    output_path = Path(output_dir) if output_dir else DEFAULT_OUTPUT_DIR
     output_path.mkdir(parents=True, exist_ok=True)
     
-    conn = get_connection()
+    # Also creates/migrates the schema before DuckDB attaches the file
+    get_connection().close()
+    duck = _duckdb_source(DB_PATH)
     exported = {}
-    timestamp = datetime.now().strftime("%Y%m%d")
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d")
     
     tables = ['posts', 'comments', 'job_history']
     
-    for table in tables:
-        try:
-            print(f"📦 Exporting {table}...")
-            df = pd.read_sql(f"SELECT * FROM {table}", conn)
+    # Arrow/DuckDB compression releases the GIL, so one table's encoding
+    # overlaps the next one's SQLite scan
+    print(f"📦 Exporting {', '.join(tables)}...")
+    with ThreadPoolExecutor(max_workers=min(4, len(tables))) as pool:
+        futures = {
+            pool.submit(_export_table, table, output_path / f"db_{table}_{timestamp}.parquet",
+                        compression, duck, EXPORT_USE_GPU): table
+            for table in tables
+        }
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                output_file, rows = future.result()
+            except Exception as e:
+                print(f"   ❌ Failed to export {table}: {e}")
+                continue
             
-            if len(df) > 0:
-                output_file = output_path / f"db_{table}_{timestamp}.parquet"
-                df.to_parquet(output_file, engine="pyarrow", compression="snappy")
-                
+            if rows > 0:
                 size_mb = output_file.stat().st_size / (1024 * 1024)
-                print(f"   ✅ {output_file.name} ({len(df)} rows, {size_mb:.2f} MB)")
+                print(f"   ✅ {output_file.name} ({rows} rows, {size_mb:.2f} MB)")
                 exported[table] = str(output_file)
             else:
                 print(f"   ⏭️ {table} is empty, skipping")
-        except Exception as e:
-            print(f"   ❌ Failed to export {table}: {e}")
     
-    conn.close()
+    if duck is not None:
+        duck.close()
     return exported
 
-
-def list_parquet_files(directory="data/parquet"):
-    """List all Parquet files in directory."""
-    parquet_dir = Path(directory)
-    
-    if not parquet_dir.exists():
+def list_parquet_files(directory=DEFAULT_OUTPUT_DIR):
+    """List all Parquet files and partitioned dataset directories in directory, newest first."""
+    try:
+        with os.scandir(directory) as it:
+            entries = [e for e in it if e.is_dir() or (e.name.endswith('.parquet') and e.is_file())]
+    except FileNotFoundError:
         print(f"📁 No Parquet directory found at {directory}")
         return []
     
-    files = list(parquet_dir.glob("*.parquet"))
+    # DirEntry caches its stat, so each entry costs one syscall at most
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
     
-    print(f"\n📁 Parquet Files in {directory}:")
-    print("-" * 60)
+    # Built up and printed with one write, not one per file
+    lines = [f"\n📁 Parquet Files in {directory}:", "-" * 60]
     
-    for f in files:
-        size_mb = f.stat().st_size / (1024 * 1024)
-        mtime = datetime.fromtimestamp(f.stat().st_mtime).strftime("%Y-%m-%d %H:%M")
-        print(f"   {f.name:<40} {size_mb:>6.2f} MB  {mtime}")
+    for e in entries:
+        st = e.stat()
+        if e.is_dir():
+            name, size = f"{e.name}/", _output_size(Path(e.path))
+        else:
+            name, size = e.name, st.st_size
+        mtime = time.strftime("%Y-%m-%d %H:%M", time.localtime(st.st_mtime))
+        lines.append(f"   {name:<40} {size / (1024 * 1024):>6.2f} MB  {mtime}")
     
-    print("-" * 60)
-    print(f"Total: {len(files)} files")
+    lines.append("-" * 60)
+    lines.append(f"Total: {len(entries)} files")
+    print("\n".join(lines))
     
-    return [str(f) for f in files]
-
+    return [e.path for e in entries]
 
 # CLI for testing
 if __name__ == "__main__":
@@ -3,20 +3,41 @@
 Full-featured scraper with analytics, dashboard, notifications, and scheduling.
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import numpy as np
 import datetime
 import time
 import os
 import xml.etree.ElementTree as ET
 import argparse
+import asyncio
+import csv
 import random
 import sys
 import json
 import subprocess
 import tempfile
+import hashlib
+import shutil
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 from pathlib import Path
 
+try:
+    from xxhash import xxh64_intdigest as _hash64
+except ImportError:
+    def _hash64(text):
+        return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # --- CONFIGURATION ---
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
@@ -29,9 +50,33 @@ MIRRORS = [
     "https://redlib.tux.pizza"
 ]
 
+# Media files download in parallel through one pool shared by the whole run
+DOWNLOAD_WORKERS = 16
+# Scraped rows are buffered and written to CSV this many at a time
+CSV_FLUSH_ROWS = 1000
+# Bytes per read when streaming media to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Comment threads fetched concurrently per batch (kept low to stay polite)
+COMMENT_CONCURRENCY = 8
+# Direct image links, matched against the URL path (query string dropped)
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+# 64-bit hashes of seen permalinks (see _seen_key), not the strings themselves:
+# a few times smaller for long histories, and collisions are negligible
 SEEN_URLS = set()
 SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": USER_AGENT})
+SESSION.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+# Keep-alive pools sized for the mirrors and the media workers; transient
+# errors are retried with backoff, and the last response is still returned
+_ADAPTER = HTTPAdapter(
+    pool_connections=len(MIRRORS) * 2,
+    pool_maxsize=max(32, DOWNLOAD_WORKERS),
+    max_retries=Retry(total=3, backoff_factor=0.5,
+                      status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+MEDIA_POOL = None
 
 # --- DIRECTORY SETUP ---
 def setup_directories(target, prefix):
@@ -41,6 +86,9 @@ def setup_directories(target, prefix):
         "base": base_dir,
         "posts": f"{base_dir}/posts.csv",
         "comments": f"{base_dir}/comments.csv",
+        # Parquet datasets used instead of the CSVs with --storage parquet
+        "posts_parquet": f"{base_dir}/posts_parquet",
+        "comments_parquet": f"{base_dir}/comments_parquet",
         "media": f"{base_dir}/media",
         "images": f"{base_dir}/media/images",
         "videos": f"{base_dir}/media/videos",
@@ -59,34 +107,80 @@ def get_file_path(target, type_prefix):
     sanitized_target = target.replace("/", "_")
     return f"data/{type_prefix}_{sanitized_target}.csv"
 
-def load_history(filepath):
-    """Loads existing CSV history to prevent duplicates."""
+def _raise_interrupt(signum, frame):
+    """SIGTERM handler: stop like Ctrl-C so buffered rows still get saved."""
+    raise KeyboardInterrupt(f"signal {signum}")
+
+def _seen_key(permalink):
+    """SEEN_URLS entry for a permalink."""
+    return _hash64(str(permalink))
+
+def _format_created(rows):
+    """
+    Replace the raw created_utc epochs in rows with ISO strings (UTC, whole
+    seconds) in one vectorized pass; rows that are already formatted are skipped.
+    """
+    rows = [row for row in rows if not isinstance(row['created_utc'], str)]
+    if rows:
+        epochs = np.array([row['created_utc'] or 0 for row in rows], dtype='float64')
+        stamps = np.datetime_as_string(epochs.astype('int64').astype('datetime64[s]'))
+        for row, stamp in zip(rows, stamps.tolist()):
+            row['created_utc'] = stamp
+
+def load_history(filepath, dataset_dir=None):
+    """Loads existing CSV (and Parquet dataset) history to prevent duplicates."""
     SEEN_URLS.clear()
     if os.path.exists(filepath):
         try:
-            df = pd.read_csv(filepath)
-            for url in df['permalink']:
-                SEEN_URLS.add(str(url))
+            df = pd.read_csv(filepath, usecols=['permalink'])
+            SEEN_URLS.update([_seen_key(url) for url in df['permalink'].to_numpy()])
             print(f"📚 Loaded {len(SEEN_URLS)} existing items from {filepath}")
         except:
             pass
+    
+    if dataset_dir and os.path.isdir(dataset_dir):
+        try:
+            from export.parquet import read_dataset_column
+            # Only the permalink column is read from the Parquet files
+            permalinks = read_dataset_column(dataset_dir, 'permalink')
+            SEEN_URLS.update([_seen_key(url) for url in permalinks])
+            print(f"📚 Loaded {len(permalinks)} existing items from {dataset_dir}")
+        except Exception as e:
+            print(f"⚠️ Could not read {dataset_dir}: {e}")
+
+def append_csv(rows, filepath, fieldnames=None):
+    """
+    Appends rows (dicts) to a CSV with csv.DictWriter, adding a header if the
+    file is new. An existing file's header decides the column order.
+    """
+    if not rows:
+        return 0
+    
+    header = None
+    if os.path.exists(filepath):
+        with open(filepath, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), None)
+    
+    with open(filepath, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=header or fieldnames or list(rows[0]),
+                                extrasaction='ignore', lineterminator=os.linesep)
+        if not header:
+            writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
 
 def save_posts_csv(posts, filepath):
     """Saves posts to CSV with all metadata."""
     if not posts:
         return 0
     
-    new_posts = [p for p in posts if p['permalink'] not in SEEN_URLS]
+    new_posts = [p for p in posts if _seen_key(p['permalink']) not in SEEN_URLS]
     
     if new_posts:
-        df = pd.DataFrame(new_posts)
-        if os.path.exists(filepath):
-            df.to_csv(filepath, mode='a', header=False, index=False)
-        else:
-            df.to_csv(filepath, index=False)
+        append_csv(new_posts, filepath, POST_FIELDS)
         
         for p in new_posts:
-            SEEN_URLS.add(p['permalink'])
+            SEEN_URLS.add(_seen_key(p['permalink']))
         
         print(f"✅ Saved {len(new_posts)} new posts")
         return len(new_posts)
@@ -99,12 +193,7 @@ def save_comments_csv(comments, filepath):
     if not comments:
         return
     
-    df = pd.DataFrame(comments)
-    if os.path.exists(filepath):
-        df.to_csv(filepath, mode='a', header=False, index=False)
-    else:
-        df.to_csv(filepath, index=False)
-    
+    append_csv(comments, filepath, COMMENT_FIELDS)
     print(f"💬 Saved {len(comments)} comments")
 
 # --- MEDIA DOWNLOAD ---
@@ -113,7 +202,7 @@ def get_media_urls(post_data):
     media = {"images": [], "videos": [], "galleries": []}
     
     url = post_data.get('url', '')
-    if any(ext in url.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
+    if url.partition('?')[0].lower().endswith(IMAGE_EXTS):
         media["images"].append(url)
     
     if 'i.redd.it' in url:
@@ -152,6 +241,11 @@ def get_media_urls(post_data):
     
     return media
 
+def _stream_to(response, f):
+    """Copy a streamed response body to an open file in DOWNLOAD_CHUNK_SIZE reads."""
+    response.raw.decode_content = True  # undo gzip/deflate transfer encoding
+    shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+
 def download_media(url, save_path, media_type="image"):
     """Downloads a single media file."""
     try:
@@ -161,8 +255,7 @@ def download_media(url, save_path, media_type="image"):
         response = SESSION.get(url, timeout=30, stream=True)
         if response.status_code == 200:
             with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                _stream_to(response, f)
             return True
     except Exception as e:
         pass
@@ -196,8 +289,7 @@ def download_reddit_video_with_audio(video_url, save_path):
             response = SESSION.get(video_url, timeout=60, stream=True)
             if response.status_code != 200:
                 return False
-            for chunk in response.iter_content(chunk_size=8192):
-                video_temp.write(chunk)
+            _stream_to(response, video_temp)
         
         # Try to download audio
         audio_temp_path = None
@@ -207,8 +299,7 @@ def download_reddit_video_with_audio(video_url, save_path):
                 if response.status_code == 200:
                     with tempfile.NamedTemporaryFile(suffix='_audio.mp4', delete=False) as audio_temp:
                         audio_temp_path = audio_temp.name
-                        for chunk in response.iter_content(chunk_size=8192):
-                            audio_temp.write(chunk)
+                        _stream_to(response, audio_temp)
                     break
             except:
                 continue
@@ -259,22 +350,36 @@ def download_reddit_video_with_audio(video_url, save_path):
         pass
     return False
 
+def get_media_pool():
+    """The shared media download pool (created on first use)."""
+    global MEDIA_POOL
+    if MEDIA_POOL is None:
+        MEDIA_POOL = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="media")
+    return MEDIA_POOL
+
+def set_download_workers(workers):
+    """Resize the media download pool (takes effect on the next download)."""
+    global DOWNLOAD_WORKERS, MEDIA_POOL
+    DOWNLOAD_WORKERS = max(1, workers)
+    if MEDIA_POOL is not None:
+        MEDIA_POOL.shutdown(wait=True)
+        MEDIA_POOL = None
+
 def download_post_media(post_data, dirs, post_id):
-    """Downloads all media from a post."""
+    """Downloads all media from a post, in parallel on the shared media pool."""
     media = get_media_urls(post_data)
     downloaded = {"images": 0, "videos": 0}
+    tasks = []  # (download function, args, counter key)
     
     for i, img_url in enumerate(media["images"][:5]):
         ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
         save_path = os.path.join(dirs["images"], f"{post_id}_{i}{ext}")
-        if download_media(img_url, save_path, "image"):
-            downloaded["images"] += 1
+        tasks.append((download_media, (img_url, save_path, "image"), "images"))
     
     for i, img_url in enumerate(media["galleries"][:10]):
         ext = '.jpg'
         save_path = os.path.join(dirs["images"], f"{post_id}_gallery_{i}{ext}")
-        if download_media(img_url, save_path, "gallery"):
-            downloaded["images"] += 1
+        tasks.append((download_media, (img_url, save_path, "gallery"), "images"))
     
     for i, vid_url in enumerate(media["videos"][:2]):
         if 'youtube' not in vid_url:
@@ -282,10 +387,15 @@ def download_post_media(post_data, dirs, post_id):
             save_path = os.path.join(dirs["videos"], f"{post_id}_{i}{ext}")
             # Use enhanced download for Reddit videos (includes audio)
             if 'v.redd.it' in vid_url or 'reddit.com' in vid_url:
-                if download_reddit_video_with_audio(vid_url, save_path):
-                    downloaded["videos"] += 1
-            elif download_media(vid_url, save_path, "video"):
-                downloaded["videos"] += 1
+                tasks.append((download_reddit_video_with_audio, (vid_url, save_path), "videos"))
+            else:
+                tasks.append((download_media, (vid_url, save_path, "video"), "videos"))
+    
+    pool = get_media_pool()
+    futures = {pool.submit(fn, *args): key for fn, args, key in tasks}
+    for future in as_completed(futures):
+        if future.result():
+            downloaded[futures[future]] += 1
     
     return downloaded
 
@@ -295,16 +405,11 @@ def scrape_comments(permalink, max_depth=3):
     comments = []
     
     try:
-        if not permalink.startswith('http'):
-            url = f"https://old.reddit.com{permalink}.json?limit=100"
-        else:
-            url = f"{permalink}.json?limit=100"
-        
-        response = SESSION.get(url, timeout=15)
+        response = SESSION.get(_comments_url(permalink), timeout=15)
         if response.status_code != 200:
             return comments
         
-        data = response.json()
+        data = _json_loads(response.content)
         
         if len(data) > 1:
             comment_data = data[1]['data']['children']
@@ -313,19 +418,73 @@ def scrape_comments(permalink, max_depth=3):
     except Exception as e:
         pass
     
-    if len(comments) > 0:
-        print(f"   + Scraped {len(comments)} comments")
-    
     return comments
 
+def _comments_url(permalink):
+    if not permalink.startswith('http'):
+        return f"https://old.reddit.com{permalink}.json?limit=100"
+    return f"{permalink}.json?limit=100"
+
+async def _fetch_comments_async(session, semaphore, permalink, max_depth=3):
+    """Fetch and parse one post's comments (empty list on any failure)."""
+    import aiohttp
+    
+    async with semaphore:
+        try:
+            async with session.get(_comments_url(permalink),
+                                   timeout=aiohttp.ClientTimeout(total=15)) as response:
+                if response.status != 200:
+                    return []
+                data = _json_loads(await response.read())
+        except Exception:
+            return []
+    
+    if len(data) > 1:
+        return parse_comments(data[1]['data']['children'], permalink, depth=0, max_depth=max_depth)
+    return []
+
+async def _scrape_comments_batch_async(permalinks, max_depth=3):
+    import aiohttp
+    
+    semaphore = asyncio.Semaphore(COMMENT_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=32)
+    async with aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}, connector=connector) as session:
+        return await asyncio.gather(*[
+            _fetch_comments_async(session, semaphore, permalink, max_depth)
+            for permalink in permalinks
+        ])
+
+def scrape_comments_batch(permalinks, max_depth=3):
+    """
+    Scrapes comments for several posts concurrently (aiohttp, at most
+    COMMENT_CONCURRENCY requests in flight). Returns one list per permalink.
+    """
+    if not permalinks:
+        return []
+    
+    try:
+        import aiohttp
+    except ImportError:
+        # One at a time, as before aiohttp
+        results = []
+        for permalink in permalinks:
+            results.append(scrape_comments(permalink, max_depth))
+            time.sleep(1)
+        return results
+    
+    return asyncio.run(_scrape_comments_batch_async(permalinks, max_depth))
+
 def parse_comments(comment_list, post_permalink, depth=0, max_depth=3):
-    """Recursively parses comments."""
+    """Parses comments depth-first with an explicit stack (no recursion)."""
     comments = []
     
     if depth > max_depth:
         return comments
     
-    for item in comment_list:
+    # Reversed pushes keep the output in the same pre-order as a recursive walk
+    stack = [(item, depth) for item in reversed(comment_list)]
+    while stack:
+        item, depth = stack.pop()
         if item['kind'] != 't1':
             continue
         
@@ -338,16 +497,16 @@ def parse_comments(comment_list, post_permalink, depth=0, max_depth=3):
             "author": c.get('author'),
             "body": c.get('body', ''),
             "score": c.get('score', 0),
-            "created_utc": datetime.datetime.fromtimestamp(c.get('created_utc', 0)).isoformat(),
+            "created_utc": c.get('created_utc', 0),  # epoch until _format_created
             "depth": depth,
             "is_submitter": c.get('is_submitter', False),
         }
         comments.append(comment)
         
         replies = c.get('replies')
-        if replies and isinstance(replies, dict):
+        if depth < max_depth and replies and isinstance(replies, dict):
             reply_children = replies.get('data', {}).get('children', [])
-            comments.extend(parse_comments(reply_children, post_permalink, depth + 1, max_depth))
+            stack.extend((child, depth + 1) for child in reversed(reply_children))
     
     return comments
 
@@ -355,13 +514,14 @@ def parse_comments(comment_list, post_permalink, depth=0, max_depth=3):
 def extract_post_data(post_json):
     """Extracts comprehensive post data."""
     p = post_json
+    url = p.get('url') or ''
     
     post_type = "text"
     if p.get('is_video'):
         post_type = "video"
     elif p.get('is_gallery'):
         post_type = "gallery"
-    elif any(ext in p.get('url', '').lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']) or 'i.redd.it' in p.get('url', ''):
+    elif url.partition('?')[0].lower().endswith(IMAGE_EXTS) or 'i.redd.it' in url:
         post_type = "image"
     elif p.get('is_self'):
         post_type = "text"
@@ -372,7 +532,7 @@ def extract_post_data(post_json):
         "id": p.get('id'),
         "title": p.get('title'),
         "author": p.get('author'),
-        "created_utc": datetime.datetime.fromtimestamp(p.get('created_utc', 0)).isoformat(),
+        "created_utc": p.get('created_utc', 0),  # epoch until _format_created
         "permalink": p.get('permalink'),
         "url": p.get('url_overridden_by_dest', p.get('url')),
         "score": p.get('score', 0),
@@ -385,14 +545,20 @@ def extract_post_data(post_json):
         "is_spoiler": p.get('spoiler', False),
         "flair": p.get('link_flair_text', ''),
         "total_awards": p.get('total_awards_received', 0),
-        "has_media": p.get('is_video', False) or p.get('is_gallery', False) or 'i.redd.it' in p.get('url', ''),
+        "has_media": p.get('is_video', False) or p.get('is_gallery', False) or 'i.redd.it' in url,
         "media_downloaded": False,
         "source": "History-Full"
     }
 
+# CSV columns, in the order extract_post_data/parse_comments produce them
+POST_FIELDS = list(extract_post_data({}))
+COMMENT_FIELDS = ["post_permalink", "comment_id", "parent_id", "author", "body",
+                  "score", "created_utc", "depth", "is_submitter"]
+
 # --- FULL HISTORY SCRAPE ---
 def run_full_history(target, limit, is_user=False, download_media_flag=True, 
-                     scrape_comments_flag=True, dry_run=False, use_plugins=False):
+                     scrape_comments_flag=True, dry_run=False, use_plugins=False,
+                     storage="csv"):
     """
     Full scrape with images, videos, and comments.
     
@@ -404,6 +570,8 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
         scrape_comments_flag: Scrape comments
         dry_run: Simulate without saving data
         use_plugins: Run post-processing plugins
+        storage: "csv" (posts.csv/comments.csv) or "parquet" (date-partitioned
+            posts_parquet/ and comments_parquet/ datasets, needs pyarrow)
     """
     prefix = "u" if is_user else "r"
     mode = "full" if download_media_flag and scrape_comments_flag else "history"
@@ -419,6 +587,7 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
     print(f"   🖼️  Download media: {download_media_flag and not dry_run}")
     print(f"   💬 Scrape comments: {scrape_comments_flag}")
     print(f"   🔌 Plugins enabled: {use_plugins}")
+    print(f"   💾 Storage: {storage}")
     print("-" * 50)
     
     # Start job tracking
@@ -431,7 +600,7 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
     
     # Setup directories (even for dry run, to check existing data)
     dirs = setup_directories(target, prefix)
-    load_history(dirs["posts"])
+    load_history(dirs["posts"], dirs["posts_parquet"])
     
     after = None
     total_posts = 0
@@ -441,6 +610,36 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
     all_scraped_comments = []
     start_time = time.time()
     error_msg = None
+    # Rows waiting to be appended to the CSVs in one write
+    pending_posts = []
+    pending_comments = []
+    
+    def flush_pending():
+        if storage == "parquet":
+            from export.parquet import (append_to_dataset, POST_CSV_COLUMNS, POST_INT_COLUMNS,
+                                        COMMENT_CSV_COLUMNS, COMMENT_INT_COLUMNS)
+            save_posts = lambda rows: append_to_dataset(rows, dirs["posts_parquet"],
+                                                        POST_CSV_COLUMNS, POST_INT_COLUMNS)
+            save_comments = lambda rows: append_to_dataset(rows, dirs["comments_parquet"],
+                                                           COMMENT_CSV_COLUMNS, COMMENT_INT_COLUMNS)
+        else:
+            save_posts = lambda rows: append_csv(rows, dirs["posts"], POST_FIELDS)
+            save_comments = lambda rows: append_csv(rows, dirs["comments"], COMMENT_FIELDS)
+        
+        _format_created(pending_posts)
+        _format_created(pending_comments)
+        if pending_posts:
+            print(f"✅ Saved {save_posts(pending_posts)} new posts")
+            pending_posts.clear()
+        if pending_comments:
+            print(f"💬 Saved {save_comments(pending_comments)} comments")
+            pending_comments.clear()
+    
+    # The dashboard's Stop button sends SIGTERM; handle it like Ctrl-C
+    previous_sigterm = None
+    if threading.current_thread() is threading.main_thread():
+        previous_sigterm = signal.signal(signal.SIGTERM, _raise_interrupt)
+    interrupted = None
     
     try:
         while total_posts < limit:
@@ -464,7 +663,7 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
                     response = SESSION.get(target_url, timeout=15)
                     
                     if response.status_code == 200:
-                        data = response.json()
+                        data = _json_loads(response.content)
                         posts = []
                         batch_comments = []
                         
@@ -473,10 +672,10 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
                         
                         for child in children:
                             p = child['data']
-                            post = extract_post_data(p)
-                            
-                            if post['permalink'] in SEEN_URLS:
+                            # Check history before building the row
+                            if _seen_key(p.get('permalink')) in SEEN_URLS:
                                 continue
+                            post = extract_post_data(p)
                             
                             # Download media (skip in dry run)
                             if download_media_flag and not dry_run:
@@ -489,28 +688,36 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
                                     print(f"   + Downloaded: {downloaded['images']} images, {downloaded['videos']} videos")
                             
                             posts.append(post)
-                            
-                            # Scrape comments
-                            if scrape_comments_flag and post['num_comments'] > 0:
-                                print(f"   💬 Fetching comments for: {post['title'][:40]}...")
-                                comments = scrape_comments(post['permalink'])
-                                batch_comments.extend(comments)
-                                total_comments += len(comments)
-                                time.sleep(1)
+                        
+                        # Scrape comments for the whole batch concurrently
+                        if scrape_comments_flag:
+                            permalinks = [p['permalink'] for p in posts if p['num_comments'] > 0]
+                            if permalinks:
+                                print(f"   💬 Fetching comments for {len(permalinks)} posts...")
+                                for comments in scrape_comments_batch(permalinks):
+                                    batch_comments.extend(comments)
+                                total_comments += len(batch_comments)
+                                print(f"   + Scraped {len(batch_comments)} comments")
                         
                         # Collect for plugins
                         all_scraped_posts.extend(posts)
                         all_scraped_comments.extend(batch_comments)
                         
-                        # Save data (skip in dry run)
+                        # Buffer data for the CSVs (skip in dry run)
                         if not dry_run:
-                            saved = save_posts_csv(posts, dirs["posts"])
-                            total_posts += saved
+                            new_posts = [p for p in posts if _seen_key(p['permalink']) not in SEEN_URLS]
+                            for p in new_posts:
+                                SEEN_URLS.add(_seen_key(p['permalink']))
+                            pending_posts.extend(new_posts)
+                            pending_comments.extend(batch_comments)
+                            total_posts += len(new_posts)
                             
-                            if batch_comments:
-                                save_comments_csv(batch_comments, dirs["comments"])
+                            if len(pending_posts) >= CSV_FLUSH_ROWS or len(pending_comments) >= CSV_FLUSH_ROWS:
+                                flush_pending()
                         else:
                             # In dry run, just count
+                            _format_created(posts)
+                            _format_created(batch_comments)
                             total_posts += len(posts)
                             print(f"   🧪 [DRY RUN] Would save {len(posts)} posts")
                         
@@ -540,6 +747,9 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
                 print(f"\n⏸️ Cooling down (3s)...")
                 time.sleep(3)
         
+        # Save before plugins touch the same dicts
+        flush_pending()
+        
         # Run plugins on collected data
         if use_plugins and (all_scraped_posts or all_scraped_comments):
             print("\n🔌 Running post-processing plugins...")
@@ -556,9 +766,22 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
             except Exception as e:
                 print(f"   ⚠️ Plugin error: {e}")
     
+    except KeyboardInterrupt as e:
+        interrupted = e
+        error_msg = "Interrupted"
+        print("\n🛑 Scrape interrupted")
     except Exception as e:
         error_msg = str(e)
         print(f"\n❌ Scrape error: {e}")
+    finally:
+        if previous_sigterm is not None:
+            signal.signal(signal.SIGTERM, previous_sigterm)
+        # Write whatever is still buffered, including after an error or stop
+        try:
+            flush_pending()
+        except Exception as e:
+            error_msg = error_msg or str(e)
+            print(f"\n❌ Failed to save data: {e}")
     
     duration = time.time() - start_time
     
@@ -590,6 +813,9 @@ def run_full_history(target, limit, is_user=False, download_media_flag=True,
         print(f"   💬 Total comments: {total_comments}")
     print(f"   ⏱️  Duration: {duration:.1f}s")
     
+    if interrupted:
+        raise interrupted
+    
     return {
         'posts': total_posts,
         'images': total_media['images'],
@@ -664,6 +890,7 @@ Commands:
     python main.py <target> --mode monitor
     python main.py <target> --dry-run           # Test without saving
     python main.py <target> --plugins           # Enable post-processing
+    python main.py <target> --storage parquet   # Save as Parquet instead of CSV
     
   SEARCH:
     python main.py --search "keyword" --subreddit delhi
@@ -688,6 +915,7 @@ Commands:
     
   REST API:
     python main.py --api                        # Start REST API server
+    python main.py --api --production           # REST API on gunicorn workers
         """
     )
     
@@ -698,6 +926,10 @@ Commands:
     parser.add_argument("--limit", type=int, default=100, help="Max posts to scrape")
     parser.add_argument("--no-media", action="store_true", help="Skip media download")
     parser.add_argument("--no-comments", action="store_true", help="Skip comments")
+    parser.add_argument("--download-workers", type=int, default=DOWNLOAD_WORKERS,
+                        help="Parallel media downloads")
+    parser.add_argument("--storage", choices=["csv", "parquet"], default="csv",
+                        help="Save scraped posts/comments as CSV or date-partitioned Parquet")
     
     # Dashboard
     parser.add_argument("--dashboard", action="store_true", help="Launch web dashboard")
@@ -732,6 +964,8 @@ Commands:
     parser.add_argument("--vacuum", action="store_true", help="Optimize SQLite database")
     parser.add_argument("--export-parquet", type=str, help="Export subreddit to Parquet format")
     parser.add_argument("--api", action="store_true", help="Start REST API server (port 8000)")
+    parser.add_argument("--production", action="store_true",
+                        help="With --api: serve with multi-worker gunicorn instead of uvicorn")
     
     args = parser.parse_args()
     
@@ -751,12 +985,32 @@ Commands:
         print("\n🚀 Starting REST API server...")
         print("   📖 Docs: http://localhost:8000/docs")
         print("   📊 Connect Metabase/Grafana to http://localhost:8000")
+        if args.production:
+            # Multi-worker gunicorn (not available on Windows)
+            root = Path(__file__).resolve().parent
+            try:
+                import gunicorn
+            except ImportError:
+                print("❌ Install gunicorn for --production: pip install gunicorn")
+                sys.exit(1)
+            try:
+                subprocess.run(
+                    [sys.executable, "-m", "gunicorn", "api.server:app",
+                     "-c", str(root / "api" / "gunicorn_conf.py")],
+                    cwd=root, check=True
+                )
+            except subprocess.CalledProcessError as e:
+                print(f"❌ gunicorn exited with status {e.returncode}")
+                sys.exit(e.returncode)
+            return
+        
         try:
             import uvicorn
             from api.server import app
-            uvicorn.run(app, host="0.0.0.0", port=8000)
+            from config import API_HOST, API_PORT, API_LOOP, API_HTTP
+            uvicorn.run(app, host=API_HOST, port=API_PORT, loop=API_LOOP, http=API_HTTP, access_log=False)
         except ImportError:
-            print("❌ Install dependencies: pip install fastapi uvicorn")
+            print("❌ Install dependencies: pip install fastapi 'uvicorn[standard]'")
         return
     
     # --- NEW: Maintenance & Observability Commands ---
@@ -857,6 +1111,8 @@ Commands:
         parser.print_help()
         return
     
+    set_download_workers(args.download_workers)
+    
     if args.mode == "monitor":
         prefix = "u" if args.user else "r"
         dirs = setup_directories(args.target, prefix)
@@ -868,12 +1124,17 @@ Commands:
     elif args.mode == "history":
         run_full_history(args.target, args.limit, args.user, 
                         download_media_flag=False, scrape_comments_flag=False,
-                        dry_run=args.dry_run, use_plugins=args.plugins)
+                        dry_run=args.dry_run, use_plugins=args.plugins,
+                        storage=args.storage)
     else:
         run_full_history(args.target, args.limit, args.user,
                         download_media_flag=not args.no_media,
                         scrape_comments_flag=not args.no_comments,
-                        dry_run=args.dry_run, use_plugins=args.plugins)
+                        dry_run=args.dry_run, use_plugins=args.plugins,
+                        storage=args.storage)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
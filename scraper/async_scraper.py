@@ -20,6 +20,8 @@ import tempfile
 
 # Semaphore to limit concurrent requests
 semaphore = None
+# Direct image links, matched against the URL path (query string dropped)
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
 
 async def fetch_json(session, url, retries=3):
     """Fetch JSON with retry logic."""
@@ -181,18 +183,22 @@ async def fetch_comments_async(session, permalink):
     return []
 
 def parse_comments_sync(comment_list, post_permalink, depth=0, max_depth=3):
-    """Parse comments (sync helper)."""
+    """Parse comments (sync helper, iterative depth-first)."""
     comments = []
     
     if depth > max_depth:
         return comments
     
-    for item in comment_list:
+    # Reversed pushes keep the output in the same pre-order as a recursive walk
+    stack = [(item, depth) for item in reversed(comment_list)]
+    while stack:
+        item, depth = stack.pop()
         if item['kind'] != 't1':
             continue
         
         c = item['data']
-        comments.append({
+        
+        comment = {
             "post_permalink": post_permalink,
             "comment_id": c.get('id'),
             "parent_id": c.get('parent_id'),
@@ -202,14 +208,13 @@ def parse_comments_sync(comment_list, post_permalink, depth=0, max_depth=3):
             "created_utc": datetime.datetime.fromtimestamp(c.get('created_utc', 0)).isoformat(),
             "depth": depth,
             "is_submitter": c.get('is_submitter', False),
-        })
+        }
+        comments.append(comment)
         
         replies = c.get('replies')
-        if replies and isinstance(replies, dict):
-            comments.extend(parse_comments_sync(
-                replies.get('data', {}).get('children', []),
-                post_permalink, depth + 1, max_depth
-            ))
+        if depth < max_depth and replies and isinstance(replies, dict):
+            reply_children = replies.get('data', {}).get('children', [])
+            stack.extend((child, depth + 1) for child in reversed(reply_children))
     
     return comments
 
@@ -219,7 +224,7 @@ def extract_media_urls(post_data):
     
     url = post_data.get('url', '')
     
-    if any(ext in url.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
+    if url.partition('?')[0].lower().endswith(IMAGE_EXTS):
         media["images"].append(url)
     
     if 'i.redd.it' in url:
@@ -255,12 +260,14 @@ def extract_media_urls(post_data):
 
 def extract_post_data(p):
     """Extract post data from JSON."""
+    url = p.get('url') or ''
+    
     post_type = "text"
     if p.get('is_video'):
         post_type = "video"
     elif p.get('is_gallery'):
         post_type = "gallery"
-    elif any(ext in p.get('url', '').lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']) or 'i.redd.it' in p.get('url', ''):
+    elif url.partition('?')[0].lower().endswith(IMAGE_EXTS) or 'i.redd.it' in url:
         post_type = "image"
     elif p.get('is_self'):
         post_type = "text"
@@ -284,7 +291,7 @@ def extract_post_data(p):
         "is_spoiler": p.get('spoiler', False),
         "flair": p.get('link_flair_text', ''),
         "total_awards": p.get('total_awards_received', 0),
-        "has_media": p.get('is_video', False) or p.get('is_gallery', False) or 'i.redd.it' in p.get('url', ''),
+        "has_media": p.get('is_video', False) or p.get('is_gallery', False) or 'i.redd.it' in url,
         "media_downloaded": False,
         "source": "Async-Scraper"
     }